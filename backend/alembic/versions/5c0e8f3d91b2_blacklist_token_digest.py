@@ -0,0 +1,104 @@
+"""blacklist token digest
+
+Revision ID: 5c0e8f3d91b2
+Revises: a12a00eaa170
+Create Date: 2026-10-18 10:02:17.540913
+
+Replaces the raw JWT stored in blacklisted_tokens.token with a 16 byte
+digest of its jti claim (or of the whole token for tokens issued without
+one). Existing rows are converted in batches.
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import jwt
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e8f3d91b2'
+down_revision: Union[str, Sequence[str], None] = 'a12a00eaa170'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+blacklisted_tokens = sa.table(
+    'blacklisted_tokens',
+    sa.column('id', sa.Integer()),
+    sa.column('token', sa.String()),
+    sa.column('token_digest', sa.LargeBinary(16)),
+)
+
+
+def _digest(token: str) -> bytes:
+    try:
+        jti = jwt.decode(token, options={"verify_signature": False}).get("jti")
+    except jwt.InvalidTokenError:
+        jti = None
+    return hashlib.blake2b((jti or token).encode(), digest_size=16).digest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklisted_tokens', sa.Column('token_digest', sa.LargeBinary(length=16), nullable=True))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(blacklisted_tokens.c.id, blacklisted_tokens.c.token)
+            .where(blacklisted_tokens.c.id > last_id)
+            .order_by(blacklisted_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            blacklisted_tokens.update()
+            .where(blacklisted_tokens.c.id == sa.bindparam('row_id'))
+            .values(token_digest=sa.bindparam('digest')),
+            [{'row_id': row.id, 'digest': _digest(row.token)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('blacklisted_tokens') as batch_op:
+        batch_op.alter_column('token_digest', existing_type=sa.LargeBinary(length=16), nullable=False)
+        batch_op.drop_index('ix_blacklisted_tokens_token')
+        batch_op.drop_column('token')
+        batch_op.create_index(batch_op.f('ix_blacklisted_tokens_token_digest'), ['token_digest'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Raw tokens cannot be recovered, so the old column is filled with the
+    hex digest. Those rows no longer match any token and only expire.
+    """
+    op.add_column('blacklisted_tokens', sa.Column('token', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(blacklisted_tokens.c.id, blacklisted_tokens.c.token_digest)
+            .where(blacklisted_tokens.c.id > last_id)
+            .order_by(blacklisted_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            blacklisted_tokens.update()
+            .where(blacklisted_tokens.c.id == sa.bindparam('row_id'))
+            .values(token=sa.bindparam('hex_digest')),
+            [{'row_id': row.id, 'hex_digest': row.token_digest.hex()} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('blacklisted_tokens') as batch_op:
+        batch_op.alter_column('token', existing_type=sa.String(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_blacklisted_tokens_token_digest'))
+        batch_op.drop_column('token_digest')
+        batch_op.create_index(batch_op.f('ix_blacklisted_tokens_token'), ['token'], unique=True)
@@ -0,0 +1,68 @@
+"""resume and user indexes
+
+Revision ID: 7f2b9c4e1a06
+Revises: 5c0e8f3d91b2
+Create Date: 2026-10-18 11:20:44.902131
+
+Indexes for the hot read paths: resumes by owner (newest first), users by
+role, and on PostgreSQL pg_trgm GIN indexes backing the admin ILIKE
+'%search%' on username and email. PostgreSQL indexes are built
+CONCURRENTLY so the tables stay writable during the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2b9c4e1a06'
+down_revision: Union[str, Sequence[str], None] = '5c0e8f3d91b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = {
+    'ix_users_username_trgm': 'username',
+    'ix_users_email_trgm': 'email',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    if postgresql:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_user_id_created_date', 'resumes', ['user_id', 'created_date'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_users_role'), 'users', ['role'],
+            unique=False, postgresql_concurrently=True,
+        )
+        if postgresql:
+            for name, column in TRIGRAM_INDEXES.items():
+                op.create_index(
+                    name, 'users', [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        if postgresql:
+            for name in TRIGRAM_INDEXES:
+                op.drop_index(name, table_name='users', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_users_role'), table_name='users', postgresql_concurrently=True)
+        op.drop_index(
+            'ix_resumes_user_id_created_date', table_name='resumes',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,57 @@
+"""resume blobs
+
+Revision ID: 9b3e6f1d2a47
+Revises: c41e7a9d2f38
+Create Date: 2026-10-18 19:02:11.548213
+
+Content-addressed resume files: resume_blobs counts the resumes sharing each
+SHA-256 and resumes.content_hash points at it. Existing rows keep a NULL
+content_hash until `python -m app.CV.dedupe` moves their files into the store.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e6f1d2a47'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a9d2f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resume_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_date', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    with op.batch_alter_table('resumes') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_resumes_content_hash_resume_blobs', 'resume_blobs',
+            ['content_hash'], ['sha256'],
+        )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_content_hash', 'resumes', ['content_hash'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_resumes_content_hash', table_name='resumes',
+            postgresql_concurrently=True,
+        )
+    with op.batch_alter_table('resumes') as batch_op:
+        batch_op.drop_constraint('fk_resumes_content_hash_resume_blobs', type_='foreignkey')
+        batch_op.drop_column('content_hash')
+    op.drop_table('resume_blobs')
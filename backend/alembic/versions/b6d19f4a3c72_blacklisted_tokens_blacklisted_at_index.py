@@ -0,0 +1,37 @@
+"""blacklisted_tokens blacklisted_at index
+
+Revision ID: b6d19f4a3c72
+Revises: f2b7d05c3e81
+Create Date: 2026-10-18 23:41:09.517203
+
+Each reload of the revoked-token cache re-reads the rows blacklisted shortly
+before the newest one it has seen.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d19f4a3c72'
+down_revision: Union[str, Sequence[str], None] = 'f2b7d05c3e81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_blacklisted_tokens_blacklisted_at', 'blacklisted_tokens',
+            ['blacklisted_at'], unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_blacklisted_tokens_blacklisted_at', table_name='blacklisted_tokens',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""resumes created_date id index
+
+Revision ID: c41e7a9d2f38
+Revises: 7f2b9c4e1a06
+Create Date: 2026-10-18 12:05:31.417806
+
+Backs the keyset pagination of /resumes/expert/all on (created_date, id).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9d2f38'
+down_revision: Union[str, Sequence[str], None] = '7f2b9c4e1a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_created_date_id', 'resumes', ['created_date', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_resumes_created_date_id', table_name='resumes',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""resumes file_path index
+
+Revision ID: d8a4c2e7b519
+Revises: 9b3e6f1d2a47
+Create Date: 2026-10-18 21:14:37.402118
+
+Index for `python -m app.CV.reconcile`, which walks resumes in the byte order
+storage keys are listed in. On PostgreSQL the index uses the "C" collation so
+the walk is an index scan whatever the database collation.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4c2e7b519'
+down_revision: Union[str, Sequence[str], None] = '9b3e6f1d2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        columns = [sa.text('file_path COLLATE "C"'), 'id']
+    else:
+        columns = ['file_path', 'id']
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_file_path_id', 'resumes', columns,
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_resumes_file_path_id', table_name='resumes',
+            postgresql_concurrently=True,
+        )
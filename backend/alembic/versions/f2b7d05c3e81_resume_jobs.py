@@ -0,0 +1,54 @@
+"""resume jobs
+
+Revision ID: f2b7d05c3e81
+Revises: d8a4c2e7b519
+Create Date: 2026-10-18 22:40:05.117630
+
+Queue of post-upload processing jobs run by `python -m app.CV.worker`, and
+resumes.processing_status summing them up. Existing resumes keep a NULL
+status and get no jobs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d05c3e81'
+down_revision: Union[str, Sequence[str], None] = 'd8a4c2e7b519'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('resumes') as batch_op:
+        batch_op.add_column(sa.Column('processing_status', sa.String(length=20), nullable=True))
+    op.create_table(
+        'resume_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_date', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_date', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_resume_jobs_status_run_after', 'resume_jobs', ['status', 'run_after'], unique=False
+    )
+    op.create_index('ix_resume_jobs_resume_id', 'resume_jobs', ['resume_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_jobs_resume_id', table_name='resume_jobs')
+    op.drop_index('ix_resume_jobs_status_run_after', table_name='resume_jobs')
+    op.drop_table('resume_jobs')
+    with op.batch_alter_table('resumes') as batch_op:
+        batch_op.drop_column('processing_status')
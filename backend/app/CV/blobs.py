@@ -0,0 +1,95 @@
+"""
+Content-addressed storage of resume files. Every distinct content is stored
+once, keyed by its SHA-256, and a row in resume_blobs counts the resumes that
+reference it. Reference changes lock the blob row until the transaction ends,
+so a blob is never deleted while an upload is storing a copy of it. Dropping
+the last reference leaves the row at zero; its object and row are purged
+once that transaction has committed, so a rolled-back delete keeps the file.
+"""
+
+import asyncio
+import os
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.storage import Storage
+from app.CV.ingest import IngestedFile
+from app.CV.models import ResumeBlob
+
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def blob_key(sha256: str) -> str:
+    """Two-level fan-out on the hash, e.g. 3f/a2/3fa2..., ~65k leaf directories"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def flat_blob_key(sha256: str) -> str:
+    """Key of blobs stored before the fan-out layout"""
+    return sha256
+
+
+async def add_reference(db: AsyncSession, upload: IngestedFile, storage: Storage) -> bool:
+    """
+    Count a new reference to the upload's content. The first copy of a content
+    is moved into storage, later copies are discarded. Returns True when the
+    content was already stored.
+    """
+    insert = _INSERT[db.get_bind().dialect.name]
+    statement = (
+        insert(ResumeBlob)
+        .values(sha256=upload.sha256, size=upload.size, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=[ResumeBlob.sha256],
+            set_={"ref_count": ResumeBlob.ref_count + 1},
+        )
+        .returning(ResumeBlob.ref_count)
+    )
+    ref_count = await db.scalar(statement)
+
+    key = blob_key(upload.sha256)
+    # a missing object behind an existing blob is restored from this upload
+    if ref_count == 1 or not await asyncio.to_thread(storage.exists, key):
+        await asyncio.to_thread(storage.store, key, upload.path)
+    else:
+        await asyncio.to_thread(os.remove, upload.path)
+    return ref_count > 1
+
+
+async def release_reference(db: AsyncSession, sha256: str) -> bool:
+    """
+    Drop one reference to a blob. Call after the referencing resume is deleted
+    and flushed. Returns True when it was the last one; pass the blob to
+    purge_blob after the transaction has committed.
+    """
+    ref_count = await db.scalar(
+        update(ResumeBlob)
+        .where(ResumeBlob.sha256 == sha256)
+        .values(ref_count=ResumeBlob.ref_count - 1)
+        .returning(ResumeBlob.ref_count)
+    )
+    return ref_count is not None and ref_count <= 0
+
+
+async def purge_blob(db: AsyncSession, sha256: str, storage: Storage) -> bool:
+    """
+    Delete the object and row of a blob nothing references, in a transaction
+    of its own. An upload of the same content waits on the row lock and then
+    stores the file again. Returns True when the blob was removed.
+    """
+    blob = await db.scalar(
+        select(ResumeBlob)
+        .filter(ResumeBlob.sha256 == sha256, ResumeBlob.ref_count <= 0)
+        .with_for_update()
+    )
+    if blob is None:
+        await db.rollback()
+        return False
+    # until the layout migration has run, the object may sit at either key
+    for key in (blob_key(sha256), flat_blob_key(sha256)):
+        await asyncio.to_thread(storage.delete, key)
+    await db.delete(blob)
+    await db.commit()
+    return True
@@ -0,0 +1,129 @@
+"""
+Moves resume files stored before content addressing into the blob store.
+
+Resumes without a content_hash are hashed in parallel, batch by batch; each
+new content is put into resume storage (linked or copied for the local
+backend), the rows are pointed at its blob and the old files are removed once
+the batch is committed. Interrupted runs
+are resumed by running the command again:
+
+    python -m app.CV.dedupe --workers 8
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import session_local
+from app.core.storage import Storage
+from app.CV.blobs import blob_key
+from app.CV.models import Resume, ResumeBlob
+from app.CV.routes import resume_storage
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class DedupeStats:
+    resumes: int = 0
+    blobs_created: int = 0
+    duplicates: int = 0
+    missing: int = 0
+    bytes_freed: int = 0
+
+
+def hash_file(path: str) -> Optional[Tuple[str, int]]:
+    """SHA-256 and size of a file, None when it does not exist"""
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                hasher.update(chunk)
+                size += len(chunk)
+    except FileNotFoundError:
+        return None
+    return hasher.hexdigest(), size
+
+
+def dedupe_resumes(
+    db: Session, storage: Storage, workers: int = 8, batch_size: int = 500
+) -> DedupeStats:
+    """Move every resume without a content_hash into the blob store"""
+    stats = DedupeStats()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            resumes = db.scalars(
+                select(Resume)
+                .filter(Resume.content_hash.is_(None), Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(batch_size)
+            ).all()
+            if not resumes:
+                break
+            last_id = resumes[-1].id
+
+            hashes = pool.map(hash_file, [resume.file_path for resume in resumes])
+            replaced, blobs = [], {}
+            for resume, result in zip(resumes, hashes):
+                stats.resumes += 1
+                if result is None:
+                    logger.warning("Resume %d: %s is missing", resume.id, resume.file_path)
+                    stats.missing += 1
+                    continue
+                sha256, size = result
+                key = blob_key(sha256)
+                blob = blobs.get(sha256) or db.get(ResumeBlob, sha256, with_for_update=True)
+                if blob is None:
+                    blob = ResumeBlob(sha256=sha256, size=size, ref_count=0)
+                    db.add(blob)
+                    stats.blobs_created += 1
+                else:
+                    stats.duplicates += 1
+                    stats.bytes_freed += size
+                if not storage.exists(key):
+                    storage.store(key, Path(resume.file_path), keep_source=True)
+                blobs[sha256] = blob
+                blob.ref_count += 1
+                if resume.file_path != storage.location(key):
+                    replaced.append(resume.file_path)
+                resume.content_hash = sha256
+                resume.file_path = storage.location(key)
+            db.commit()
+
+            for path in replaced:
+                if os.path.exists(path):
+                    os.remove(path)
+            logger.info("Deduplicated %d resumes up to id %d", stats.resumes, last_id)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    with session_local() as db:
+        stats = dedupe_resumes(db, resume_storage, args.workers, args.batch_size)
+    print(
+        f"resumes={stats.resumes} blobs_created={stats.blobs_created} "
+        f"duplicates={stats.duplicates} missing={stats.missing} "
+        f"bytes_freed={stats.bytes_freed}"
+    )
+
+
+if __name__ == "__main__":
+    main()
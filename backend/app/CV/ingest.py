@@ -0,0 +1,199 @@
+"""
+Single-pass ingestion of multipart uploads: the request body is parsed as it
+arrives and the file part is hashed and written once, into a temporary file
+next to its final location, instead of being spooled by the form parser and
+copied afterwards.
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Collection, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect
+
+logger = logging.getLogger(__name__)
+
+# Boundaries, part headers and small form fields allowed on top of the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Staging files, f".upload-{uuid}.part"; the reconciler sweeps stale ones
+STAGED_UPLOAD_PATTERN = ".upload-*.part"
+
+
+@dataclass
+class IngestedFile:
+    path: Path
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+class _FilePartParser:
+    """
+    Callbacks for MultipartParser collecting the data of the first file part
+    named `field`. Callbacks cannot await, so data is buffered and the caller
+    flushes it between chunks of the request body.
+    """
+
+    def __init__(self, field: str, max_bytes: int):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.filename: Optional[str] = None
+        self.content_type = ""
+        self.size = 0
+        self.buffer = bytearray()
+        self.finished = False
+        self._in_target = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        self._in_target = (
+            self.filename is None
+            and b"filename" in options
+            and _decode(options.get(b"name", b"")) == self.field
+        )
+        if self._in_target:
+            self.filename = _decode(options[b"filename"])
+            content_type, _ = parse_options_header(self._headers.get(b"content-type"))
+            self.content_type = _decode(content_type)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_target:
+            self.size += end - start
+            if self.size <= self.max_bytes:
+                self.buffer += data[start:end]
+
+    def on_part_end(self) -> None:
+        self._in_target = False
+
+    def on_end(self) -> None:
+        self.finished = True
+
+    def parser(self, boundary: bytes) -> MultipartParser:
+        return MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self.on_part_begin,
+                "on_part_data": self.on_part_data,
+                "on_part_end": self.on_part_end,
+                "on_header_field": self.on_header_field,
+                "on_header_value": self.on_header_value,
+                "on_header_end": self.on_header_end,
+                "on_headers_finished": self.on_headers_finished,
+                "on_end": self.on_end,
+            },
+        )
+
+
+def _write(file: BinaryIO, hasher, data: bytes) -> None:
+    hasher.update(data)
+    file.write(data)
+
+
+async def ingest_upload(
+    request: Request,
+    field: str,
+    directory: Path,
+    max_bytes: int,
+    allowed_types: Collection[str],
+    buffer_size: int,
+) -> IngestedFile:
+    """
+    Stream the multipart body of `request` once, writing the file part named
+    `field` to a temporary file in `directory` and hashing it on the way.
+    Bodies whose Content-Length alone exceeds the limit are rejected before
+    anything is read. The caller moves the result into storage.
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File size too large. Maximum {max_bytes // (1024 * 1024)}MB allowed.",
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+            raise too_large
+
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+    state = _FilePartParser(field, max_bytes)
+    parser = state.parser(boundary)
+    hasher = hashlib.sha256()
+    path = directory / f".upload-{uuid.uuid4().hex}.part"
+    completed = False
+    file = None
+    try:
+        file = await asyncio.to_thread(open, path, "xb")
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if state.filename is not None and state.content_type not in allowed_types:
+                raise HTTPException(
+                    status_code=400, detail="Only PDF files are allowed"
+                )
+            if state.size > max_bytes:
+                raise too_large
+            if len(state.buffer) >= buffer_size:
+                data, state.buffer = bytes(state.buffer), bytearray()
+                await asyncio.to_thread(_write, file, hasher, data)
+        parser.finalize()
+        if not state.finished:
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+        if state.filename is None:
+            raise HTTPException(status_code=400, detail=f"No '{field}' file in the upload")
+        await asyncio.to_thread(_write, file, hasher, bytes(state.buffer))
+        completed = True
+    except MultipartParseError:
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+    except OSError:
+        logger.exception("Writing upload to %s failed", directory)
+        raise HTTPException(status_code=500, detail="File upload failed")
+    except ClientDisconnect:
+        logger.info("Client disconnected during upload")
+        raise
+    finally:
+        # nothing to clean up when the file could not be created
+        if file is not None:
+            await asyncio.to_thread(file.close)
+            if not completed:
+                await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    return IngestedFile(
+        path=path,
+        filename=state.filename,
+        content_type=state.content_type,
+        size=state.size,
+        sha256=hasher.hexdigest(),
+    )
@@ -0,0 +1,163 @@
+"""
+Durable queue of post-upload processing jobs, kept in resume_jobs.
+
+An upload inserts one job per kind in RESUME_JOBS in the same transaction as
+its resume and returns; workers (`python -m app.CV.worker`) run them later.
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+workers share the queue without blocking each other, and each claim is a
+lease: a job whose worker died is claimed again once the visibility timeout
+has passed. A result is only recorded by the attempt holding the lease.
+Resume.processing_status follows the jobs: pending, then ready once all are
+done or failed as soon as one has failed for good.
+"""
+
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.CV.models import Resume, ResumeJob
+from app.CV.routes import resume_storage
+
+# head and tail of the file searched for the PDF header and trailer
+PDF_MARKER_WINDOW = 1024
+
+
+class PermanentJobError(Exception):
+    """The job cannot succeed on a retry, e.g. the file is not a PDF"""
+
+
+def validate_pdf(path: Path) -> None:
+    """The file carries a PDF header and trailer, so it is not truncated or mislabeled"""
+    with open(path, "rb") as file:
+        head = file.read(PDF_MARKER_WINDOW)
+        file.seek(max(path.stat().st_size - PDF_MARKER_WINDOW, 0))
+        tail = file.read()
+    if b"%PDF-" not in head:
+        raise PermanentJobError("Not a PDF file")
+    if b"%%EOF" not in tail:
+        raise PermanentJobError("PDF file is truncated")
+
+
+JOB_HANDLERS: Dict[str, Callable[[Path], None]] = {
+    "validate_pdf": validate_pdf,
+}
+
+
+def run_job(kind: str, location: str) -> None:
+    """Run a job on the resume file at `location`; called in a worker process"""
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        raise PermanentJobError(f"Unknown job kind {kind!r}")
+    key = resume_storage.key_for(location)
+    path = Path(location) if key is None else resume_storage.local_path(key)
+    if path is not None:
+        if not path.exists():
+            raise PermanentJobError("Resume file is missing")
+        handler(path)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        copy = Path(directory) / "resume"
+        resume_storage.fetch(key, copy)
+        handler(copy)
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    resume_id: int
+    kind: str
+    attempts: int
+    location: str
+
+
+def claim_jobs(
+    db: Session, limit: int, visibility_timeout: float, max_attempts: int
+) -> List[ClaimedJob]:
+    """Lease up to `limit` due jobs to this worker"""
+    now = datetime.utcnow()
+    rows = db.execute(
+        select(ResumeJob, Resume.file_path)
+        .join(Resume, Resume.id == ResumeJob.resume_id)
+        .filter(ResumeJob.status.in_(("queued", "running")), ResumeJob.run_after <= now)
+        .order_by(ResumeJob.run_after)
+        .limit(limit)
+        .with_for_update(of=ResumeJob, skip_locked=True)
+    ).all()
+
+    claimed = []
+    for job, file_path in rows:
+        if job.status == "running" and job.attempts >= max_attempts:
+            # the last attempt's worker never reported back
+            job.status = "failed"
+            job.last_error = "Visibility timeout exceeded"
+            db.flush()
+            _update_processing_status(db, job.resume_id)
+            continue
+        job.status = "running"
+        job.attempts += 1
+        job.run_after = now + timedelta(seconds=visibility_timeout)
+        claimed.append(ClaimedJob(job.id, job.resume_id, job.kind, job.attempts, file_path))
+    db.commit()
+    return claimed
+
+
+def finish_job(
+    db: Session,
+    claimed: ClaimedJob,
+    error: Optional[BaseException],
+    max_attempts: int,
+    retry_seconds: float,
+) -> Optional[str]:
+    """
+    Record the outcome of a claimed job and return its new status: done,
+    queued again after a backoff, or failed when the error is permanent or
+    attempts are used up. None when the lease was lost (the job was claimed
+    again) or the resume is gone.
+    """
+    # the resume row serializes status updates of its jobs
+    resume_id = db.scalar(
+        select(Resume.id).filter(Resume.id == claimed.resume_id).with_for_update()
+    )
+    job = db.scalar(
+        select(ResumeJob).filter(
+            ResumeJob.id == claimed.id,
+            ResumeJob.status == "running",
+            ResumeJob.attempts == claimed.attempts,
+        )
+    )
+    if resume_id is None or job is None:
+        db.rollback()
+        return None
+
+    if error is None:
+        job.status = "done"
+        job.last_error = None
+    else:
+        job.last_error = f"{type(error).__name__}: {error}"[:1000]
+        if isinstance(error, PermanentJobError) or job.attempts >= max_attempts:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            delay = retry_seconds * 2 ** (job.attempts - 1)
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+    db.flush()
+    status = job.status
+    _update_processing_status(db, job.resume_id)
+    db.commit()
+    return status
+
+
+def _update_processing_status(db: Session, resume_id: int) -> None:
+    statuses = set(db.scalars(select(ResumeJob.status).filter(ResumeJob.resume_id == resume_id)))
+    if "failed" in statuses:
+        status = "failed"
+    elif statuses <= {"done"}:
+        status = "ready"
+    else:
+        status = "pending"
+    db.execute(update(Resume).where(Resume.id == resume_id).values(processing_status=status))
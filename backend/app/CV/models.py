@@ -1,10 +1,33 @@
-from sqlalchemy import ForeignKey, String, Integer, Column, DateTime, func
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, String, Integer, Column, DateTime, Index, Text, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 # from users.models import UsersModel
 from app.core.database import Base
 
 
+class byte_order(FunctionElement):
+    """A string column compared byte by byte, as the resume store lists its keys"""
+
+    inherit_cache = True
+    type = String()
+
+
+@compiles(byte_order)
+def _compile_byte_order(element, compiler, **kw):
+    # SQLite and most others already compare strings bytewise
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(byte_order, "postgresql")
+def _compile_byte_order_postgresql(element, compiler, **kw):
+    # whatever the database collation
+    return compiler.process(list(element.clauses)[0].collate("C"), **kw)
+
+
 class Resume(Base):
     __tablename__ = "resumes"
 
@@ -14,8 +37,67 @@ class Resume(Base):
     file_name = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
+    # Blob holding the content; NULL for files stored before deduplication
+    content_hash = Column(String(64), ForeignKey("resume_blobs.sha256"), nullable=True)
+    # pending until every post-upload job is done, then ready (or failed);
+    # NULL for resumes uploaded before the job queue
+    processing_status = Column(String(20), nullable=True)
     created_date = Column(DateTime, server_default=func.now(), nullable=False)
     updated_date = Column(
         DateTime, server_default=func.now(), server_onupdate=func.now(), nullable=False
     )
     user = relationship("UsersModel", back_populates="resumes")
+    # the database deletes jobs with their resume
+    jobs = relationship("ResumeJob", passive_deletes=True)
+
+    __table_args__ = (
+        # my-resumes, delete_resume and the expert listing filter/join on user_id
+        Index("ix_resumes_user_id_created_date", "user_id", "created_date"),
+        # keyset pagination of the expert listing
+        Index("ix_resumes_created_date_id", "created_date", "id"),
+        Index("ix_resumes_content_hash", "content_hash"),
+        # the reconciler's walk in storage key order
+        Index("ix_resumes_file_path_id", byte_order(file_path), "id"),
+    )
+
+
+class ResumeBlob(Base):
+    """Stored file content shared by all resumes with the same SHA-256"""
+
+    __tablename__ = "resume_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    # Resume rows pointing at this blob; the file goes when it drops to 0
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_date = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class ResumeJob(Base):
+    """One post-upload processing step of a resume, run by `python -m app.CV.worker`"""
+
+    __tablename__ = "resume_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(50), nullable=False)
+    # queued -> running -> done, back to queued for a retry, or failed
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    # When the job may next be claimed: now, after a retry delay, or while
+    # running when the worker's lease (visibility timeout) runs out. Compared
+    # with the worker's UTC clock, so not left to the database default
+    run_after = Column(
+        DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False
+    )
+    last_error = Column(Text, nullable=True)
+    created_date = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_date = Column(
+        DateTime, server_default=func.now(), server_onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        # the worker's claim query
+        Index("ix_resume_jobs_status_run_after", "status", "run_after"),
+        Index("ix_resume_jobs_resume_id", "resume_id"),
+    )
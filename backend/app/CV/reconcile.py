@@ -0,0 +1,357 @@
+"""
+Reconciles stored resume files with the resumes table.
+
+A crash between storing an upload and committing its row leaves an orphan
+file, and a lost commit after a delete removed the file leaves a dangling row
+pointing at nothing. The store and the table are both walked in key order,
+the table in keyset batches and the store as the driver lists it, and merged
+like two sorted files, so neither is ever held in memory. Items are paced to
+a fixed rate to keep the extra I/O well below production traffic.
+
+Without --repair discrepancies are only logged. With it, orphan files older
+than the grace period (younger ones may belong to an upload still
+committing) are deleted when a second look still finds no resume or blob
+row for them, and dangling rows whose file is still missing are deleted
+along with their blob reference. Staging files of uploads that never
+finished, older than the grace period, are deleted as well.
+
+    python -m app.CV.reconcile --repair --rate 200
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import session_local
+from app.core.storage import Storage
+from app.CV.ingest import STAGED_UPLOAD_PATTERN
+from app.CV.models import Resume, ResumeBlob, byte_order
+from app.CV.routes import RESUMES_DIR, resume_storage
+
+logger = logging.getLogger(__name__)
+
+reconcile_discrepancies = metrics.counter(
+    "resume_reconcile_discrepancies_total",
+    "Orphan files, dangling resume rows and stale staged uploads found by the reconciler",
+    ("kind",),
+)
+reconcile_repairs = metrics.counter(
+    "resume_reconcile_repairs_total",
+    "Orphan files, dangling resume rows and stale staged uploads removed by the reconciler",
+    ("kind",),
+)
+reconcile_runs = metrics.counter(
+    "resume_reconcile_runs_total", "Reconciler runs by outcome", ("outcome",)
+)
+reconcile_duration = metrics.histogram(
+    "resume_reconcile_duration_seconds", "Wall time of one reconciler run"
+)
+
+
+@dataclass
+class ReconcileStats:
+    objects: int = 0
+    resumes: int = 0
+    orphans: int = 0
+    recent: int = 0
+    dangling: int = 0
+    stale_uploads: int = 0
+    removed_objects: int = 0
+    removed_resumes: int = 0
+    removed_uploads: int = 0
+
+
+class RateLimiter:
+    """Paces callers to `rate` items per second on average (0 is unlimited)"""
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self.next = clock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = self.clock()
+        # no credit is saved up while idle, so a pause is never followed by a burst
+        self.next = max(self.next, now) + self.interval
+        # sleeping in slices of at least 50 ms keeps the timer overhead down
+        if self.next - now >= 0.05:
+            self.sleep(self.next - now)
+
+
+def _in_order(items: Iterable[tuple], source: str) -> Iterator[tuple]:
+    # a merge of unsorted input would report (and repair) live data as missing
+    last = None
+    for item in items:
+        if last is not None and item[0] <= last:
+            raise RuntimeError(f"{source} keys out of order: {item[0]!r} after {last!r}")
+        last = item[0]
+        yield item
+
+
+def _resume_keys(
+    db: Session, storage: Storage, batch_size: int
+) -> Iterator[Tuple[str, List[int]]]:
+    """(key, resume ids) of the resumes kept in `storage`, in key order"""
+    # the order ix_resumes_file_path_id is built in
+    path = byte_order(Resume.file_path)
+    query = (
+        select(Resume.file_path, Resume.id)
+        .filter(Resume.file_path.startswith(storage.location(""), autoescape=True))
+        .order_by(path, Resume.id)
+        .limit(batch_size)
+    )
+
+    def rows() -> Iterator[Tuple[str, int]]:
+        last = None
+        while True:
+            batch_query = query if last is None else query.filter(tuple_(path, Resume.id) > last)
+            batch = db.execute(batch_query).all()
+            # end the read transaction, nothing is held between batches
+            db.rollback()
+            if not batch:
+                return
+            last = tuple_(*batch[-1])
+            for file_path, resume_id in batch:
+                key = storage.key_for(file_path)
+                if key:
+                    yield key, resume_id
+
+    for key, group in groupby(rows(), key=itemgetter(0)):
+        yield key, [resume_id for _, resume_id in group]
+
+
+def _stale_uploads(directory: Path, cutoff: float) -> Iterator[Path]:
+    """Staging files left by uploads that failed without cleaning up"""
+    for path in sorted(directory.glob(STAGED_UPLOAD_PATTERN)):
+        try:
+            modified = path.stat().st_mtime
+        except FileNotFoundError:  # finished or cleaned up since the listing
+            continue
+        if modified <= cutoff:
+            yield path
+
+
+def _merge(
+    objects: Iterator[Tuple[str, float]], resumes: Iterator[Tuple[str, List[int]]]
+) -> Iterator[Tuple[str, Optional[float], List[int]]]:
+    """Outer join of the two key-ordered streams: (key, modified or None, resume ids)"""
+    obj, row = next(objects, None), next(resumes, None)
+    while obj is not None or row is not None:
+        if row is None or (obj is not None and obj[0] < row[0]):
+            yield obj[0], obj[1], []
+            obj = next(objects, None)
+        elif obj is None or row[0] < obj[0]:
+            yield row[0], None, row[1]
+            row = next(resumes, None)
+        else:
+            yield obj[0], obj[1], row[1]
+            obj, row = next(objects, None), next(resumes, None)
+
+
+def _remove_orphan(db: Session, storage: Storage, key: str) -> bool:
+    """Delete an orphan object unless a resume or blob row claims it by now"""
+    referenced = db.scalar(
+        select(Resume.id).filter(Resume.file_path == storage.location(key)).limit(1)
+    )
+    # until the layout migration has run, a blob's other copy is not an orphan;
+    # a blob left at zero references by an interrupted purge is
+    blob = db.scalar(
+        select(ResumeBlob)
+        .filter(ResumeBlob.sha256 == key.rsplit("/", 1)[-1])
+        .with_for_update()
+    )
+    if referenced is not None or (blob is not None and blob.ref_count > 0):
+        db.rollback()
+        return False
+    storage.delete(key)
+    if blob is not None:
+        db.delete(blob)
+    db.commit()
+    return True
+
+
+def _remove_dangling(db: Session, storage: Storage, key: str, resume_ids: List[int]) -> int:
+    """Delete resumes whose object is still missing, releasing their blob reference"""
+    if storage.exists(key):
+        return 0
+    resumes = db.scalars(
+        select(Resume).filter(
+            Resume.id.in_(resume_ids), Resume.file_path == storage.location(key)
+        )
+    ).all()
+    for resume in resumes:
+        db.delete(resume)
+    db.flush()
+    for resume in resumes:
+        if not resume.content_hash:
+            continue
+        ref_count = db.scalar(
+            update(ResumeBlob)
+            .where(ResumeBlob.sha256 == resume.content_hash)
+            .values(ref_count=ResumeBlob.ref_count - 1)
+            .returning(ResumeBlob.ref_count)
+        )
+        if ref_count is not None and ref_count <= 0:
+            db.execute(delete(ResumeBlob).where(ResumeBlob.sha256 == resume.content_hash))
+    db.commit()
+    return len(resumes)
+
+
+def reconcile(
+    db: Session,
+    storage: Storage,
+    repair: bool = False,
+    batch_size: int = 500,
+    rate: float = 0.0,
+    grace_seconds: float = 3600.0,
+    staging: Optional[Path] = None,
+) -> ReconcileStats:
+    """One pass over the store and the resumes table, and the `staging` directory"""
+    stats = ReconcileStats()
+    limiter = RateLimiter(rate)
+    cutoff = time.time() - grace_seconds
+
+    if staging is not None and staging.is_dir():
+        for path in _stale_uploads(staging, cutoff):
+            stats.stale_uploads += 1
+            reconcile_discrepancies.inc(kind="stale_upload")
+            logger.warning("Staged upload %s was never finished", path.name)
+            if repair:
+                path.unlink(missing_ok=True)
+                stats.removed_uploads += 1
+                reconcile_repairs.inc(kind="stale_upload")
+
+    objects = _in_order(storage.iter_objects(), "store")
+    resumes = _in_order(_resume_keys(db, storage, batch_size), "resumes")
+
+    for key, modified, resume_ids in _merge(objects, resumes):
+        limiter.wait()
+        stats.objects += modified is not None
+        stats.resumes += len(resume_ids)
+
+        if not resume_ids:
+            if modified > cutoff:
+                stats.recent += 1
+                continue
+            stats.orphans += 1
+            reconcile_discrepancies.inc(kind="orphan")
+            logger.warning("Stored resume file %s has no resume row", key)
+            if repair and _remove_orphan(db, storage, key):
+                stats.removed_objects += 1
+                reconcile_repairs.inc(kind="orphan")
+        elif modified is None:
+            stats.dangling += len(resume_ids)
+            reconcile_discrepancies.inc(len(resume_ids), kind="dangling")
+            logger.warning("Resumes %s point at missing file %s", resume_ids, key)
+            if repair:
+                removed = _remove_dangling(db, storage, key, resume_ids)
+                stats.removed_resumes += removed
+                reconcile_repairs.inc(removed, kind="dangling")
+    return stats
+
+
+def run_reconcile_once() -> ReconcileStats:
+    """One reconciler run with the configured settings, recording metrics"""
+    start = time.perf_counter()
+    db = session_local()
+    try:
+        stats = reconcile(
+            db,
+            resume_storage,
+            repair=settings.RESUME_RECONCILE_REPAIR,
+            batch_size=settings.RESUME_RECONCILE_BATCH_SIZE,
+            rate=settings.RESUME_RECONCILE_ITEMS_PER_SECOND,
+            grace_seconds=settings.RESUME_RECONCILE_GRACE_SECONDS,
+            staging=RESUMES_DIR,
+        )
+    except Exception:
+        db.rollback()
+        reconcile_runs.inc(outcome="error")
+        raise
+    finally:
+        db.close()
+        reconcile_duration.observe(time.perf_counter() - start)
+
+    reconcile_runs.inc(outcome="success")
+    return stats
+
+
+async def reconcile_worker(interval: float) -> None:
+    """Run the reconciler every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            stats = await asyncio.to_thread(run_reconcile_once)
+            logger.info(
+                "Reconciled %s stored files with %s resumes: %s orphans, %s dangling, "
+                "%s stale uploads",
+                stats.objects,
+                stats.resumes,
+                stats.orphans,
+                stats.dangling,
+                stats.stale_uploads,
+            )
+        except Exception:
+            logger.exception("Resume reconciliation failed")
+
+
+def start_reconcile_worker() -> Optional[asyncio.Task]:
+    """Schedule the reconciler on the running loop, or None when disabled"""
+    if settings.RESUME_RECONCILE_INTERVAL_SECONDS <= 0:
+        return None
+    return asyncio.create_task(reconcile_worker(settings.RESUME_RECONCILE_INTERVAL_SECONDS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--repair", action="store_true", help="Delete orphan files and dangling rows"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.RESUME_RECONCILE_BATCH_SIZE)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.RESUME_RECONCILE_ITEMS_PER_SECOND,
+        help="Items per second, 0 for no limit",
+    )
+    parser.add_argument(
+        "--grace-seconds", type=float, default=settings.RESUME_RECONCILE_GRACE_SECONDS
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    with session_local() as db:
+        stats = reconcile(
+            db,
+            resume_storage,
+            args.repair,
+            args.batch_size,
+            args.rate,
+            args.grace_seconds,
+            staging=RESUMES_DIR,
+        )
+    print(
+        f"objects={stats.objects} resumes={stats.resumes} orphans={stats.orphans} "
+        f"recent={stats.recent} dangling={stats.dangling} "
+        f"stale_uploads={stats.stale_uploads} "
+        f"removed_objects={stats.removed_objects} removed_resumes={stats.removed_resumes} "
+        f"removed_uploads={stats.removed_uploads}"
+    )
+
+
+if __name__ == "__main__":
+    main()
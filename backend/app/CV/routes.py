@@ -1,86 +1,113 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import RedirectResponse, StreamingResponse
 import os
-import aiofiles
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.file_responses import ConditionalFileResponse, offloaded_file_response
+from app.core.pagination import decode_cursor, encode_cursor, naive_utc
+from app.core.serialization import RowSerializer
+from app.core.storage import build_storage
 from app.auth.jwt_auth import get_authenticated_user
 from app.auth.role_auth import get_expert_user
-from app.users.models import UsersModel, UserRole
-from app.CV.models import Resume
+from app.auth.principal_cache import Principal
+from app.users.models import UserRole, UsersModel
+from app.CV.blobs import add_reference, blob_key, purge_blob, release_reference
+from app.CV.ingest import ingest_upload
+from app.CV.models import Resume, ResumeJob
 from app.CV.schemas import ResumeUploadResponse, ResumeResponse, ExpertResumeResponse
 
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
+# Uploads are staged here; it also holds the files with the local backend
 RESUMES_DIR = Path("uploads/resumes")
 RESUMES_DIR.mkdir(parents=True, exist_ok=True)
+resume_storage = build_storage(RESUMES_DIR)
 
+# Listings select only the columns their response schema needs
+RESUME_COLUMNS = tuple(getattr(Resume, name) for name in ResumeResponse.model_fields)
+OWNER_COLUMNS = (UsersModel.username, UsersModel.email, UsersModel.github)
 
-@router.post("/upload", response_model=ResumeUploadResponse)
+resume_rows = RowSerializer(ResumeResponse)
+expert_resume_rows = RowSerializer(ExpertResumeResponse)
+
+
+# Request body documented by hand: the handler parses the stream itself
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"resume": {"type": "string", "format": "binary"}},
+                "required": ["resume"],
+            }
+        }
+    },
+}
+
+
+@router.post(
+    "/upload",
+    response_model=ResumeUploadResponse,
+    openapi_extra={"requestBody": UPLOAD_REQUEST_BODY},
+)
 async def upload_resume(
-    resume: UploadFile = File(...),
-    current_user: UsersModel = Depends(get_authenticated_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    if resume.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
-
-    file_extension = Path(resume.filename).suffix
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
-    unique_filename = f"{current_user.id}_{timestamp}{file_extension}"
-    file_path = RESUMES_DIR / unique_filename
+    upload = await ingest_upload(
+        request,
+        field="resume",
+        directory=RESUMES_DIR,
+        max_bytes=settings.RESUME_MAX_BYTES,
+        allowed_types={"application/pdf"},
+        buffer_size=settings.RESUME_WRITE_BUFFER_BYTES,
+    )
 
-    file_size = 0
     try:
-        async with aiofiles.open(file_path, "wb") as f:
-            while True:
-                chunk = await resume.read(8192)
-                if not chunk:
-                    break
-                file_size += len(chunk)
-                if file_size > 10 * 1024 * 1024:
-                    await f.close()
-                    if file_path.exists():
-                        os.remove(file_path)
-                    raise HTTPException(
-                        status_code=400,
-                        detail="File size too large. Maximum 10MB allowed.",
-                    )
-                await f.write(chunk)
-    except Exception as e:
-        if file_path.exists():
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail="File upload failed")
-
-    db_resume = Resume(
-        user_id=current_user.id,
-        file_path=str(file_path),
-        file_name=resume.filename,
-        file_size=file_size,
-        mime_type=resume.content_type,
-    )
+        deduplicated = await add_reference(db, upload, resume_storage)
 
-    db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
+        db_resume = Resume(
+            user_id=current_user.id,
+            file_path=resume_storage.location(blob_key(upload.sha256)),
+            file_name=upload.filename,
+            file_size=upload.size,
+            mime_type=upload.content_type,
+            content_hash=upload.sha256,
+            # processed by the job workers after the response is sent
+            processing_status="pending" if settings.RESUME_JOBS else None,
+            jobs=[ResumeJob(kind=kind) for kind in settings.RESUME_JOBS],
+        )
+
+        db.add(db_resume)
+        await db.commit()
+    finally:
+        # the staged file is gone once stored or discarded; left over on failure
+        await asyncio.to_thread(upload.path.unlink, missing_ok=True)
+    await db.refresh(db_resume)
 
     return ResumeUploadResponse(
         message="Resume uploaded successfully",
         resume=ResumeResponse.from_orm(db_resume),
+        deduplicated=deduplicated,
     )
 
 
 @router.get("/download/{resume_id}")
 async def download_resume(
     resume_id: int,
-    current_user: UsersModel = Depends(get_authenticated_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    resume = await db.scalar(select(Resume).filter(Resume.id == resume_id))
 
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
@@ -94,71 +121,150 @@ async def download_resume(
             status_code=403, detail="Not authorized to access this resume"
         )
 
-    if not os.path.exists(resume.file_path):
+    media_type = resume.mime_type or "application/pdf"
+    key = resume_storage.key_for(resume.file_path)
+    if key is not None:
+        url = resume_storage.download_url(key, resume.file_name, media_type)
+        if url:
+            return RedirectResponse(url, status_code=307)
+        path = resume_storage.local_path(key)
+    else:
+        path = resume.file_path
+
+    if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="File not found on server")
 
-    return FileResponse(
-        path=resume.file_path,
+    offloaded = offloaded_file_response(
+        Path(path),
+        RESUMES_DIR,
+        mode=settings.DOWNLOAD_OFFLOAD,
+        prefix=settings.DOWNLOAD_OFFLOAD_PREFIX,
         filename=resume.file_name,
-        media_type=resume.mime_type or "application/pdf",
+        media_type=media_type,
+        cache_control=settings.RESUME_DOWNLOAD_CACHE_CONTROL,
+    )
+    if offloaded is not None:
+        return offloaded
+
+    # Blobs never change, so their hash is the ETag; older files fall back to
+    # one derived from mtime and size
+    return ConditionalFileResponse(
+        path=path,
+        filename=resume.file_name,
+        media_type=media_type,
+        etag=resume.content_hash,
+        cache_control=settings.RESUME_DOWNLOAD_CACHE_CONTROL,
     )
 
 
 @router.get("/my-resumes", response_model=List[ResumeResponse])
 async def get_my_resumes(
-    current_user: UsersModel = Depends(get_authenticated_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
-    return resumes
+    rows = await db.execute(
+        select(*RESUME_COLUMNS).filter(Resume.user_id == current_user.id)
+    )
+    return resume_rows.response(rows.all())
+
+
+# Rows fetched per round trip when streaming the expert listing
+EXPERT_STREAM_BATCH_SIZE = 500
+# Page size of the expert listing when a cursor comes without a limit
+EXPERT_PAGE_SIZE = 100
+
+
+def expert_resumes_query(
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+) -> Select:
+    """Resume rows with their owner, newest first, after an optional keyset cursor"""
+    query = (
+        select(*RESUME_COLUMNS, *OWNER_COLUMNS)
+        .join(Resume.user)
+        .order_by(Resume.created_date.desc(), Resume.id.desc())
+    )
+    if cursor:
+        query = query.filter(
+            tuple_(Resume.created_date, Resume.id) < tuple_(*decode_cursor(cursor))
+        )
+    if created_from:
+        query = query.filter(Resume.created_date >= naive_utc(created_from))
+    if created_to:
+        query = query.filter(Resume.created_date < naive_utc(created_to))
+    if user_id is not None:
+        query = query.filter(Resume.user_id == user_id)
+    return query
 
 
 @router.get("/expert/all", response_model=List[ExpertResumeResponse])
 async def get_all_resumes_expert(
-    current_user: UsersModel = Depends(get_expert_user), db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Page size; all resumes when neither it nor a cursor"
+    ),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    user_id: Optional[int] = Query(None),
+    stream: bool = Query(False, description="Every matching resume as NDJSON"),
+    current_user: Principal = Depends(get_expert_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Getting all CV's for experts"""
-    resumes = db.query(Resume).options(joinedload(Resume.user)).all()
-
-    response = []
-    for resume in resumes:
-        response.append(
-            ExpertResumeResponse(
-                id=resume.id,
-                user_id=resume.user_id,
-                file_name=resume.file_name,
-                file_size=resume.file_size,
-                file_path=resume.file_path,
-                mime_type=resume.mime_type,
-                created_date=resume.created_date,
-                updated_date=resume.updated_date,
-                username=resume.user.username,
-                email=resume.user.email,
-                github=resume.user.github,
-            )
-        )
-    return response
+    """
+    Getting CV's for experts, newest first. Pages of `limit` resumes; when more
+    follow, the X-Next-Cursor header holds the cursor for the next page.
+    Without limit or cursor every resume is returned in one response, as
+    before paging. With stream=true all resumes after the cursor are streamed
+    as NDJSON instead.
+    """
+    query = expert_resumes_query(cursor, created_from, created_to, user_id)
+
+    if stream:
+        result = await db.stream(query.execution_options(yield_per=EXPERT_STREAM_BATCH_SIZE))
+
+        async def lines():
+            async for row in result:
+                yield expert_resume_rows.dump_one(row) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    if limit is None and cursor is None:
+        return expert_resume_rows.response((await db.execute(query)).all())
+
+    limit = limit or EXPERT_PAGE_SIZE
+    rows = (await db.execute(query.limit(limit))).all()
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_date, rows[-1].id)
+    return expert_resume_rows.response(rows, headers=headers)
 
 
 @router.delete("/{resume_id}")
 async def delete_resume(
     resume_id: int,
-    current_user: UsersModel = Depends(get_authenticated_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    resume = (
-        db.query(Resume)
-        .filter(Resume.id == resume_id, Resume.user_id == current_user.id)
-        .first()
+    resume = await db.scalar(
+        select(Resume).filter(Resume.id == resume_id, Resume.user_id == current_user.id)
     )
 
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    if os.path.exists(resume.file_path):
-        os.remove(resume.file_path)
+    await db.delete(resume)
+    await db.flush()
+    released = False
+    if resume.content_hash:
+        released = await release_reference(db, resume.content_hash)
+    await db.commit()
 
-    db.delete(resume)
-    db.commit()
+    # files go only once the delete is committed
+    if released:
+        await purge_blob(db, resume.content_hash, resume_storage)
+    elif not resume.content_hash and os.path.exists(resume.file_path):
+        os.remove(resume.file_path)
 
     return {"message": "Resume deleted successfully"}
@@ -17,6 +17,7 @@ class ResumeResponse(ResumeBase):
     user_id: int
     file_path: str
     mime_type: str
+    processing_status: Optional[str] = None
     created_date: datetime
     updated_date: datetime
 
@@ -33,3 +34,5 @@ class ExpertResumeResponse(ResumeResponse):
 class ResumeUploadResponse(BaseModel):
     message: str
     resume: ResumeResponse
+    # True when identical content was already stored and is shared
+    deduplicated: bool = False
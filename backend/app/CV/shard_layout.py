@@ -0,0 +1,138 @@
+"""
+Moves content-addressed resume files into the two-level fan-out layout.
+
+Files go from the flat layout (<sha256>) to ab/cd/<sha256> while the API
+keeps serving.
+
+Blobs are processed in hash order, batch by batch: each object is copied to
+its new key in parallel, the resumes pointing at it are rewritten to the new
+location and committed, and only then is the old object deleted, so every
+committed file_path resolves at all times. The last committed hash is kept in
+a checkpoint file and an interrupted run continues after it; starting over is
+safe too, as moved blobs are skipped. Resumes without a content_hash are
+converted by `python -m app.CV.dedupe`, which writes the new layout directly.
+
+    python -m app.CV.shard_layout --workers 16
+"""
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import session_local
+from app.core.storage import Storage
+from app.CV.blobs import blob_key, flat_blob_key
+from app.CV.models import Resume, ResumeBlob
+from app.CV.routes import resume_storage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = Path("uploads/.resume-layout-checkpoint")
+
+
+@dataclass
+class LayoutStats:
+    blobs: int = 0
+    moved: int = 0
+    missing: int = 0
+    resumes: int = 0
+
+
+def _place(storage: Storage, sha256: str) -> bool:
+    """Copy a flat object to its fan-out key; False when neither exists"""
+    if storage.exists(blob_key(sha256)):
+        return True
+    if not storage.exists(flat_blob_key(sha256)):
+        return False
+    storage.copy(flat_blob_key(sha256), blob_key(sha256))
+    return True
+
+
+def migrate_layout(
+    db: Session,
+    storage: Storage,
+    workers: int = 8,
+    batch_size: int = 500,
+    checkpoint: Optional[Path] = None,
+) -> LayoutStats:
+    """Move every blob to the fan-out layout, resuming after `checkpoint`"""
+    stats = LayoutStats()
+    last = checkpoint.read_text().strip() if checkpoint and checkpoint.exists() else ""
+    if last:
+        logger.info("Resuming after blob %s", last)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            hashes = db.scalars(
+                select(ResumeBlob.sha256)
+                .filter(ResumeBlob.sha256 > last)
+                .order_by(ResumeBlob.sha256)
+                .limit(batch_size)
+            ).all()
+            if not hashes:
+                break
+            last = hashes[-1]
+
+            placed = []
+            for sha256, ok in zip(hashes, pool.map(partial(_place, storage), hashes)):
+                if ok:
+                    placed.append(sha256)
+                else:
+                    logger.warning("Blob %s has no stored object", sha256)
+                    stats.missing += 1
+            stats.blobs += len(hashes)
+
+            moved = []
+            for sha256 in placed:
+                location = storage.location(blob_key(sha256))
+                result = db.execute(
+                    update(Resume)
+                    .where(Resume.content_hash == sha256, Resume.file_path != location)
+                    .values(file_path=location)
+                )
+                if result.rowcount:
+                    moved.append(sha256)
+                    stats.resumes += result.rowcount
+            db.commit()
+
+            # also clears copies left behind by a run interrupted after its commit
+            list(pool.map(storage.delete, [flat_blob_key(sha256) for sha256 in placed]))
+            stats.moved += len(moved)
+            if checkpoint:
+                checkpoint.write_text(last)
+            logger.info("Moved %d of %d blobs up to %s", stats.moved, stats.blobs, last)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and scan all blobs"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.restart:
+        args.checkpoint.unlink(missing_ok=True)
+    with session_local() as db:
+        stats = migrate_layout(
+            db, resume_storage, args.workers, args.batch_size, args.checkpoint
+        )
+    print(
+        f"blobs={stats.blobs} moved={stats.moved} missing={stats.missing} "
+        f"resumes={stats.resumes}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Runs queued post-upload jobs (see app.CV.jobs) in a local process pool.
+
+The worker claims as many jobs as it has free processes, waits for any to
+finish and records the outcome, until SIGTERM/SIGINT; jobs still running
+then are finished first. Run as many workers as needed, on any host that
+reaches the database and the resume store. A handler running past the
+visibility timeout is handed to another worker, so the timeout must exceed
+the slowest job. A crashed pool stops the worker; its jobs are claimed again
+when their lease runs out.
+
+    python -m app.CV.worker --processes 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import session_local
+from app.CV.jobs import ClaimedJob, claim_jobs, finish_job, run_job
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerStats:
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost: int = 0
+
+
+def run_worker(
+    db: Session,
+    executor: Executor,
+    processes: int,
+    poll_seconds: float = 1.0,
+    visibility_timeout: float = 300.0,
+    max_attempts: int = 5,
+    retry_seconds: float = 30.0,
+    stop: Optional[threading.Event] = None,
+    drain: bool = False,
+) -> WorkerStats:
+    """Run jobs on `executor` until `stop` is set, or until none is due with `drain`"""
+    stats = WorkerStats()
+    stop = stop or threading.Event()
+    in_flight: Dict[Future, ClaimedJob] = {}
+
+    while True:
+        if not stop.is_set() and len(in_flight) < processes:
+            free = processes - len(in_flight)
+            for job in claim_jobs(db, free, visibility_timeout, max_attempts):
+                in_flight[executor.submit(run_job, job.kind, job.location)] = job
+        if not in_flight:
+            if stop.is_set() or drain:
+                return stats
+            stop.wait(poll_seconds)
+            continue
+
+        finished, _ = wait(in_flight, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+        for future in finished:
+            job = in_flight.pop(future)
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                raise error
+            status = finish_job(db, job, error, max_attempts, retry_seconds)
+            if status is None:
+                stats.lost += 1
+                logger.warning("Job %s (%s) lost its lease", job.id, job.kind)
+            elif status == "done":
+                stats.done += 1
+            elif status == "queued":
+                stats.retried += 1
+                logger.warning("Job %s (%s) will be retried: %s", job.id, job.kind, error)
+            else:
+                stats.failed += 1
+                logger.error(
+                    "Job %s (%s) of resume %s failed: %s", job.id, job.kind, job.resume_id, error
+                )
+
+
+def job_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Processes for run_job. They come from a fork server rather than a fork of
+    this process, which would copy its engine, open connections and any locks
+    held by its threads; the server imports the job handlers once for all.
+    """
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["app.CV.jobs"])
+    return ProcessPoolExecutor(max_workers=processes, mp_context=context)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=settings.RESUME_WORKER_PROCESSES)
+    parser.add_argument("--poll-seconds", type=float, default=settings.RESUME_WORKER_POLL_SECONDS)
+    parser.add_argument(
+        "--drain", action="store_true", help="Exit once no job is due instead of waiting"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    with session_local() as db, job_pool(args.processes) as pool:
+        stats = run_worker(
+            db,
+            pool,
+            args.processes,
+            poll_seconds=args.poll_seconds,
+            visibility_timeout=settings.RESUME_JOB_VISIBILITY_TIMEOUT_SECONDS,
+            max_attempts=settings.RESUME_JOB_MAX_ATTEMPTS,
+            retry_seconds=settings.RESUME_JOB_RETRY_SECONDS,
+            stop=stop,
+            drain=args.drain,
+        )
+    print(f"done={stats.done} retried={stats.retried} failed={stats.failed} lost={stats.lost}")
+
+
+if __name__ == "__main__":
+    main()
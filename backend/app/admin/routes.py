@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.auth.jwt_auth import get_authenticated_user
 from app.auth.role_auth import get_admin_user
+from app.auth.principal_cache import Principal, principals
 from app.users.models import UsersModel, UserRole
+from app.CV.models import Resume
 from app.admin.schemas import UserRoleUpdate, UserResponse
+from app.core.serialization import RowSerializer
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+USER_COLUMNS = tuple(getattr(UsersModel, name) for name in UserResponse.model_fields)
+user_rows = RowSerializer(UserResponse)
+
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
@@ -19,11 +25,11 @@ async def get_all_users(
     limit: int = Query(100, ge=1, le=1000),
     role: Optional[UserRole] = Query(None),
     search: Optional[str] = Query(None),
-    current_user: UsersModel = Depends(get_admin_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Getting user's names and pagination"""
-    query = db.query(UsersModel)
+    query = select(*USER_COLUMNS)
 
     if role:
         query = query.filter(UsersModel.role == role)
@@ -36,28 +42,29 @@ async def get_all_users(
             )
         )
 
-    users = query.offset(skip).limit(limit).all()
-    return users
+    rows = await db.execute(query.order_by(UsersModel.id).offset(skip).limit(limit))
+    return user_rows.response(rows.all())
 
 
 @router.patch("/users/{user_id}/role", response_model=UserResponse)
 async def update_user_role(
     user_id: int,
     role_update: UserRoleUpdate,
-    current_user: UsersModel = Depends(get_admin_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Change user's role"""
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot change your own role")
 
-    user = db.query(UsersModel).filter(UsersModel.id == user_id).first()
+    user = await db.scalar(select(UsersModel).filter(UsersModel.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.role = role_update.role
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principals.invalidate(user_id)
+    await db.refresh(user)
 
     return user
 
@@ -65,39 +72,40 @@ async def update_user_role(
 @router.patch("/users/{user_id}/activation", response_model=UserResponse)
 async def toggle_user_activation(
     user_id: int,
-    current_user: UsersModel = Depends(get_admin_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Acitvate/Deactivate user for Admin"""
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
 
-    user = db.query(UsersModel).filter(UsersModel.id == user_id).first()
+    user = await db.scalar(select(UsersModel).filter(UsersModel.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.is_active = not user.is_active
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principals.invalidate(user_id)
+    await db.refresh(user)
 
     return user
 
 
 @router.get("/stats")
 async def get_system_stats(
-    current_user: UsersModel = Depends(get_admin_user), db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """System statistics for Admins"""
-    from sqlalchemy import func
-    from CV.models import Resume
-
-    total_users = db.query(func.count(UsersModel.id)).scalar()
-    total_resumes = db.query(func.count(Resume.id)).scalar()
+    total_users = await db.scalar(select(func.count(UsersModel.id)))
+    total_resumes = await db.scalar(select(func.count(Resume.id)))
     users_by_role = (
-        db.query(UsersModel.role, func.count(UsersModel.id))
-        .group_by(UsersModel.role)
-        .all()
-    )
+        await db.execute(
+            select(UsersModel.role, func.count(UsersModel.id)).group_by(
+                UsersModel.role
+            )
+        )
+    ).all()
 
     return {
         "total_users": total_users,
@@ -108,14 +116,15 @@ async def get_system_stats(
 
 # ======================= Make an Admin just for Dev =======================
 @router.post("/make-admin/{user_id}")
-async def make_user_admin(user_id: int, db: Session = Depends(get_db)):
+async def make_user_admin(user_id: int, db: AsyncSession = Depends(get_db)):
     """Setting Admin, Just for Dev"""
-    user = db.query(UsersModel).filter(UsersModel.id == user_id).first()
+    user = await db.scalar(select(UsersModel).filter(UsersModel.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.role = UserRole.ADMIN
-    db.commit()
+    await db.commit()
+    principals.invalidate(user_id)
 
     return {"message": f"User {user.username} is now admin"}
 
@@ -2,33 +2,37 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasicCredentials, HTTPBearer
 from app.users.models import UsersModel
 from app.core.database import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.core.request_context import current_request
 import jwt
-from app.auth.token_blacklist import BlacklistedToken
+import uuid
+from app.auth.token_blacklist import BlacklistedToken, token_digest
+from app.auth.token_cache import revoked_tokens
+from app.auth.principal_cache import Principal, load_principal, principals
 
 security = HTTPBearer()
 
 
-def get_authenticated_user(
-    credentials: HTTPBasicCredentials = Depends(security), db: Session = Depends(get_db)
-):
+async def get_authenticated_user(
+    credentials: HTTPBasicCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
     token = credentials.credentials
 
-    # 1. Check if token is blacklisted
-    blacklisted_token = (
-        db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first()
-    )
-    if blacklisted_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked. Please login again.",
-        )
-
-    # 2. Validate JWT token
     try:
+        # 1. Validate JWT token
         decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+
+        # 2. Check if token is blacklisted (served from the in-process cache)
+        if await revoked_tokens.is_revoked(token_digest(token, decoded), db):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked. Please login again.",
+            )
+
         user_id = decoded.get("user_id", None)
 
         if not user_id:
@@ -52,8 +56,8 @@ def get_authenticated_user(
                 detail="Authentication failed, token expired",
             )
 
-        # Get user from database
-        user_obj = db.query(UsersModel).filter_by(id=user_id).first()
+        # Get user from the principal cache, falling back to the database
+        user_obj = await load_principal(user_id, db)
         if not user_obj:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
@@ -65,8 +69,20 @@ def get_authenticated_user(
                 detail="User account is deactivated",
             )
 
+        if is_token_superseded(decoded, user_obj):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked. Please login again.",
+            )
+
+        request_info = current_request.get()
+        if request_info is not None:
+            request_info.user_id = user_obj.id
+
         return user_obj
 
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,7 +106,8 @@ def generate_access_token(user_id: int, expire_in: int = 60 * 15) -> str:
     payload = {
         "type": "access",
         "user_id": user_id,
-        "iat": now,
+        "jti": uuid.uuid4().hex,
+        "iat": now.timestamp(),
         "exp": now + timedelta(seconds=expire_in),
     }
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm="HS256")
@@ -101,41 +118,60 @@ def generate_refresh_token(user_id: int, expire_in: int = 3600 * 24) -> str:
     payload = {
         "type": "refresh",
         "user_id": user_id,
-        "iat": now,
+        "jti": uuid.uuid4().hex,
+        "iat": now.timestamp(),
         "exp": now + timedelta(seconds=expire_in),
     }
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm="HS256")
 
 
 # Add this new function for token blacklisting
-def add_token_to_blacklist(token: str, user_id: int, db: Session):
-    """Add token to blacklist and also cleanup expired tokens"""
+async def add_token_to_blacklist(token: str, user_id: int, db: AsyncSession):
+    """Add token to blacklist, expired rows are purged by app.auth.token_purge"""
 
     # Decode token to get expiration time
     try:
         decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
         expires_at = datetime.fromtimestamp(decoded.get("exp"))
     except:
+        decoded = None
         expires_at = datetime.utcnow() + timedelta(hours=24)  # Default 24 hours
 
     # Add to blacklist
+    digest = token_digest(token, decoded)
     blacklisted_token = BlacklistedToken(
-        token=token, user_id=user_id, expires_at=expires_at
+        token_digest=digest, user_id=user_id, expires_at=expires_at
     )
     db.add(blacklisted_token)
+    await db.commit()
+    revoked_tokens.add(digest, expires_at)
 
-    # Cleanup expired blacklisted tokens
-    db.query(BlacklistedToken).filter(
-        BlacklistedToken.expires_at < datetime.utcnow()
-    ).delete()
 
-    db.commit()
+def is_token_superseded(decoded: dict, user_obj: Principal) -> bool:
+    """True when the token was issued before the user's last logout-all"""
+    if user_obj.tokens_valid_after is None:
+        return False
+    valid_after = user_obj.tokens_valid_after.replace(tzinfo=timezone.utc).timestamp()
+    return decoded.get("iat", 0) < valid_after
 
 
-def decode_refresh_token(token: str) -> int:
+async def revoke_all_user_tokens(user_id: int, db: AsyncSession):
+    """Invalidate every token issued to the user so far with a single update"""
+    await db.execute(
+        update(UsersModel)
+        .filter_by(id=user_id)
+        .values(tokens_valid_after=datetime.now(timezone.utc).replace(tzinfo=None))
+    )
+    await db.commit()
+    principals.invalidate(user_id)
+
+
+async def decode_refresh_token(token: str, db: AsyncSession = None) -> int:
     """
     Decode and validate a refresh token.
     Returns the user_id if valid, raises HTTPException if not.
+    When a session is given, tokens issued before the user's last
+    logout-all are rejected as well.
     """
     try:
         decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
@@ -154,6 +190,18 @@ def decode_refresh_token(token: str) -> int:
                 detail="Invalid refresh token payload.",
             )
 
+        if db is not None:
+            user_obj = await load_principal(user_id, db)
+            if (
+                not user_obj
+                or is_token_superseded(decoded, user_obj)
+                or await revoked_tokens.is_revoked(token_digest(token, decoded), db)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token has been revoked.",
+                )
+
         return user_id
 
     except jwt.ExpiredSignatureError:
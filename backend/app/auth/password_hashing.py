@@ -0,0 +1,112 @@
+"""Bounded worker pool that keeps bcrypt hashing off the event loop"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.users.models import pwd_context
+
+pending_jobs = metrics.gauge(
+    "password_hash_pending", "Password hash/verify calls queued or running"
+)
+rejected_jobs = metrics.counter(
+    "password_hash_rejected_total", "Password hash/verify calls rejected with 503"
+)
+
+
+def hash_password(plain_password: str) -> str:
+    return pwd_context.hash(plain_password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs hash/verify on a dedicated thread or process pool.
+    At most max_pending calls may be queued or running at once; beyond that
+    callers get a 503 instead of piling up behind a login storm.
+    With workers set to 0 calls run inline, as they did before the pool existed.
+    """
+
+    def __init__(self, workers: int, max_pending: int, executor_type: str = "process"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_type == "process":
+                        # The pool starts lazily, when logging, database and anyio
+                        # threads already run; forked children could inherit their
+                        # held locks, so workers come from a clean fork server,
+                        # which imports this module once for all of them
+                        context = multiprocessing.get_context("forkserver")
+                        context.set_forkserver_preload([__name__])
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers, mp_context=context
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                rejected_jobs.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            pending_jobs.set(self._pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                pending_jobs.set(self._pending)
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._run(hash_password, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=(
+        settings.PASSWORD_HASH_WORKERS
+        if settings.PASSWORD_HASH_WORKERS is not None
+        else min(4, os.cpu_count() or 1)
+    ),
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
@@ -0,0 +1,124 @@
+"""Short-lived per-process cache of the user fields authorization needs"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.users.models import UsersModel, UserRole
+
+cache_hits = metrics.counter(
+    "principal_cache_hits_total", "Authenticated requests served from the principal cache"
+)
+cache_misses = metrics.counter(
+    "principal_cache_misses_total", "Authenticated requests that loaded the user row"
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Slim, immutable view of an authenticated user"""
+
+    id: int
+    username: str
+    role: UserRole
+    is_active: bool
+    tokens_valid_after: Optional[datetime] = None
+
+
+class PrincipalCache:
+    """
+    LRU of Principal records keyed by user id, each valid for ttl seconds.
+    Writers that change role, activation or the token epoch call invalidate();
+    a load that raced with an invalidation is not stored.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, principal = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def put(self, principal: Principal, generation: int) -> None:
+        """Store a principal loaded while the user's generation was `generation`"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._generations.get(principal.id, 0) != generation:
+                return
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+principals = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+async def load_principal(user_id: int, db: AsyncSession) -> Optional[Principal]:
+    """Principal for user_id from the cache, or from the users table on a miss"""
+    principal = principals.get(user_id)
+    if principal is not None:
+        cache_hits.inc()
+        return principal
+
+    cache_misses.inc()
+    generation = principals.generation(user_id)
+    result = await db.execute(
+        select(
+            UsersModel.id,
+            UsersModel.username,
+            UsersModel.role,
+            UsersModel.is_active,
+            UsersModel.tokens_valid_after,
+        ).filter(UsersModel.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    principal = Principal(
+        id=row.id,
+        username=row.username,
+        role=row.role,
+        is_active=row.is_active,
+        tokens_valid_after=row.tokens_valid_after,
+    )
+    principals.put(principal, generation)
+    return principal
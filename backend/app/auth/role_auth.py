@@ -1,11 +1,12 @@
 from fastapi import Depends, HTTPException, status
-from app.users.models import UsersModel, UserRole
+from app.users.models import UserRole
 from app.auth.jwt_auth import get_authenticated_user
+from app.auth.principal_cache import Principal
 
 
 async def get_expert_user(
-    current_user: UsersModel = Depends(get_authenticated_user),
-) -> UsersModel:
+    current_user: Principal = Depends(get_authenticated_user),
+) -> Principal:
     """Checking if user is expert or not"""
     if current_user.role not in [UserRole.EXPERT, UserRole.ADMIN]:
         raise HTTPException(
@@ -16,8 +17,8 @@ async def get_expert_user(
 
 
 async def get_admin_user(
-    current_user: UsersModel = Depends(get_authenticated_user),
-) -> UsersModel:
+    current_user: Principal = Depends(get_authenticated_user),
+) -> Principal:
     """Dependency foe checking users role"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -1,15 +1,39 @@
-from sqlalchemy import Column, String, DateTime, Integer, func
+import hashlib
+from typing import Optional
+
+import jwt
+from sqlalchemy import Column, LargeBinary, DateTime, Integer, func
 from app.core.database import Base
 
+TOKEN_DIGEST_SIZE = 16
+
+
+def token_digest(token: str, decoded: Optional[dict] = None) -> bytes:
+    """
+    Fixed-size blacklist key for a token.
+    Uses the token's jti claim, falling back to the whole token for tokens
+    issued before jti was added. Pass already decoded claims to skip parsing.
+    """
+    if decoded is None:
+        try:
+            decoded = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            decoded = {}
+    key = decoded.get("jti") or token
+    return hashlib.blake2b(key.encode(), digest_size=TOKEN_DIGEST_SIZE).digest()
+
 
 class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    token = Column(String, unique=True, nullable=False, index=True)
+    token_digest = Column(
+        LargeBinary(TOKEN_DIGEST_SIZE), unique=True, nullable=False, index=True
+    )
     user_id = Column(Integer, nullable=False, index=True)
-    blacklisted_at = Column(DateTime, server_default=func.now())
+    # the revoked-token cache re-reads recent rows by this column
+    blacklisted_at = Column(DateTime, server_default=func.now(), index=True)
     expires_at = Column(DateTime, nullable=False)  # Token expiration time
 
     def __repr__(self):
-        return f"<BlacklistedToken {self.token[:10]}...>"
+        return f"<BlacklistedToken {self.token_digest.hex()[:10]}...>"
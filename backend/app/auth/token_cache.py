@@ -0,0 +1,125 @@
+"""In-process cache of revoked token digests sitting in front of blacklisted_tokens"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.token_blacklist import BlacklistedToken
+from app.core import metrics
+from app.core.config import settings
+
+cache_hits = metrics.counter(
+    "revoked_token_cache_hits_total",
+    "Authenticated requests rejected from the revoked-token cache",
+)
+cache_misses = metrics.counter(
+    "revoked_token_cache_misses_total",
+    "Authenticated requests whose token was not found in the revoked-token cache",
+)
+cache_refreshes = metrics.counter(
+    "revoked_token_cache_refreshes_total",
+    "Incremental refreshes of the revoked-token cache from blacklisted_tokens",
+)
+cache_size = metrics.gauge(
+    "revoked_token_cache_entries", "Revoked token digests currently cached"
+)
+
+
+class RevokedTokenCache:
+    """
+    Set of revoked token digests, each kept until its token would have expired.
+    New revocations from this process are added directly; revocations written by
+    other workers are picked up by polling rows with an id above the last one seen.
+    Ids are handed out before commit, so a row can become visible after one with
+    a higher id; rows blacklisted up to `overlap` seconds before the newest one
+    seen are read again to catch those.
+    """
+
+    def __init__(self, refresh_interval: float, overlap: float):
+        self.refresh_interval = refresh_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._entries: Dict[bytes, float] = {}
+        self._last_id = 0
+        self._last_blacklisted_at: Optional[datetime] = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, digest: bytes, expires_at: datetime) -> None:
+        """Record a token revoked by this process"""
+        with self._lock:
+            self._entries[digest] = expires_at.timestamp()
+            cache_size.set(len(self._entries))
+
+    async def is_revoked(self, digest: bytes, db: AsyncSession) -> bool:
+        """Check a token digest, refreshing from the database at most once per interval"""
+        if time.monotonic() >= self._next_refresh:
+            await self.refresh(db)
+
+        expiry = self._entries.get(digest)
+        if expiry is not None and expiry > time.time():
+            cache_hits.inc()
+            return True
+
+        cache_misses.inc()
+        return False
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Load blacklist rows added since the last refresh and drop expired entries"""
+        with self._lock:
+            if time.monotonic() < self._next_refresh:
+                return
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            last_id = self._last_id
+            last_blacklisted_at = self._last_blacklisted_at
+
+        new_rows = BlacklistedToken.id > last_id
+        if last_blacklisted_at is not None:
+            since = last_blacklisted_at - self.overlap
+            new_rows = or_(new_rows, BlacklistedToken.blacklisted_at >= since)
+        result = await db.execute(
+            select(
+                BlacklistedToken.id,
+                BlacklistedToken.token_digest,
+                BlacklistedToken.expires_at,
+                BlacklistedToken.blacklisted_at,
+            )
+            .filter(new_rows)
+            .order_by(BlacklistedToken.id)
+        )
+        rows = result.all()
+
+        now = time.time()
+        with self._lock:
+            for row_id, digest, expires_at, blacklisted_at in rows:
+                self._entries[digest] = expires_at.timestamp()
+                self._last_id = max(self._last_id, row_id)
+                if blacklisted_at is not None:
+                    self._last_blacklisted_at = max(
+                        self._last_blacklisted_at or blacklisted_at, blacklisted_at
+                    )
+            self._entries = {
+                digest: expiry
+                for digest, expiry in self._entries.items()
+                if expiry > now
+            }
+            cache_size.set(len(self._entries))
+        cache_refreshes.inc()
+
+    def clear(self) -> None:
+        """Forget every entry and force a full reload on the next check"""
+        with self._lock:
+            self._entries.clear()
+            self._last_id = 0
+            self._last_blacklisted_at = None
+            self._next_refresh = 0.0
+            cache_size.set(0)
+
+
+revoked_tokens = RevokedTokenCache(
+    refresh_interval=settings.REVOKED_TOKEN_CACHE_REFRESH_SECONDS,
+    overlap=settings.REVOKED_TOKEN_CACHE_OVERLAP_SECONDS,
+)
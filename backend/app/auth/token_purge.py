@@ -0,0 +1,102 @@
+"""Background cleanup of expired rows in blacklisted_tokens"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.auth.token_blacklist import BlacklistedToken
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import session_local
+
+logger = logging.getLogger(__name__)
+
+purged_rows = metrics.counter(
+    "blacklist_purge_rows_total", "Expired blacklisted tokens deleted by the purge worker"
+)
+purge_runs = metrics.counter(
+    "blacklist_purge_runs_total", "Purge worker runs by outcome", ("outcome",)
+)
+purge_last_run_rows = metrics.gauge(
+    "blacklist_purge_last_run_rows", "Rows deleted by the most recent purge run"
+)
+purge_duration = metrics.histogram(
+    "blacklist_purge_duration_seconds", "Wall time of one purge run"
+)
+
+
+def purge_expired_tokens(db: Session, batch_size: int) -> int:
+    """
+    Delete expired blacklist rows in batches of at most batch_size,
+    committing after each batch so no long lock is held. Returns rows deleted.
+    """
+    cutoff = datetime.utcnow()
+    total = 0
+
+    while True:
+        ids = [
+            row_id
+            for (row_id,) in db.query(BlacklistedToken.id)
+            .filter(BlacklistedToken.expires_at < cutoff)
+            .order_by(BlacklistedToken.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            break
+
+        db.query(BlacklistedToken).filter(BlacklistedToken.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        total += len(ids)
+
+        if len(ids) < batch_size:
+            break
+
+    return total
+
+
+def run_purge_once(batch_size: int) -> int:
+    """One purge run on its own session, recording metrics"""
+    start = time.perf_counter()
+    db = session_local()
+    try:
+        deleted = purge_expired_tokens(db, batch_size)
+    except Exception:
+        db.rollback()
+        purge_runs.inc(outcome="error")
+        raise
+    finally:
+        db.close()
+        purge_duration.observe(time.perf_counter() - start)
+
+    purged_rows.inc(deleted)
+    purge_last_run_rows.set(deleted)
+    purge_runs.inc(outcome="success")
+    return deleted
+
+
+async def purge_worker(interval: float, batch_size: int) -> None:
+    """Run a purge every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            deleted = await asyncio.to_thread(run_purge_once, batch_size)
+            logger.info("Purged %s expired blacklisted tokens", deleted)
+        except Exception:
+            logger.exception("Blacklisted token purge failed")
+
+
+def start_purge_worker() -> Optional[asyncio.Task]:
+    """Schedule the purge worker on the running loop, or None when disabled"""
+    if settings.TOKEN_PURGE_INTERVAL_SECONDS <= 0:
+        return None
+    return asyncio.create_task(
+        purge_worker(
+            settings.TOKEN_PURGE_INTERVAL_SECONDS, settings.TOKEN_PURGE_BATCH_SIZE
+        )
+    )
@@ -1,11 +1,118 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
 class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URL: Optional[str] = None
+    # Defaults to SQLALCHEMY_DATABASE_URL with its async driver (asyncpg/aiosqlite)
+    SQLALCHEMY_ASYNC_DATABASE_URL: Optional[str] = None
+    # Read-only GET endpoints are spread over these (JSON list in the env) when
+    # reachable and lagging at most REPLICA_MAX_LAG_SECONDS, else the primary
+    SQLALCHEMY_REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    REPLICA_CHECK_TIMEOUT_SECONDS: float = 1.0
     JWT_SECRET_KEY: str = "fallback-secret"
     SECRET_KEY: str = "fallback-secret-2"
+
+    # Connection pool of each engine. Pre-ping costs a round trip per checkout;
+    # with it off, set DB_POOL_RECYCLE below the server's idle timeout instead
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+
+    # Logs go through a bounded queue to a writer thread; json lines for logstash.
+    # Identical records (same message, route and level) are limited per window
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT_COUNT: int = 10
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = 60.0
+    LOG_ACCESS_REQUESTS: bool = True
+
+    # Listing rows are validated against their schema once before serializing;
+    # off, the projected rows are serialized as-is
+    LISTING_VALIDATE_ROWS: bool = True
+
+    # Largest accepted resume file, and how much upload data is buffered
+    # before each write to disk
+    RESUME_MAX_BYTES: int = 10 * 1024 * 1024
+    RESUME_WRITE_BUFFER_BYTES: int = 1024 * 1024
+
+    # Where resume files are kept: the local uploads directory, or an
+    # S3-compatible bucket (S3_ENDPOINT_URL points at MinIO and the like).
+    # Uploads are staged in the local directory either way
+    STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = "resumes/"
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_MULTIPART_CHUNK_BYTES: int = 8 * 1024 * 1024
+    S3_PRESIGNED_URL_EXPIRES_SECONDS: int = 300
+
+    # Cache-Control of resume downloads. Browsers may keep copies but must
+    # revalidate, so authorization runs on every view (304 when unchanged)
+    RESUME_DOWNLOAD_CACHE_CONTROL: str = "private, no-cache"
+
+    # Let the front proxy send local resume files after the API authorized
+    # the download: nginx maps DOWNLOAD_OFFLOAD_PREFIX (an internal location)
+    # onto the resumes directory, X-Sendfile servers get the absolute path
+    DOWNLOAD_OFFLOAD: Literal["none", "x-accel-redirect", "x-sendfile"] = "none"
+    DOWNLOAD_OFFLOAD_PREFIX: str = "/protected/resumes/"
+
+    # Stored resume files are compared with the resumes table in the
+    # background (0 disables; run it on one instance only). Orphan files
+    # younger than the grace period may belong to an upload still committing.
+    # Without repair, discrepancies are only logged
+    RESUME_RECONCILE_INTERVAL_SECONDS: float = 0.0
+    RESUME_RECONCILE_REPAIR: bool = False
+    RESUME_RECONCILE_BATCH_SIZE: int = 500
+    RESUME_RECONCILE_ITEMS_PER_SECOND: float = 500.0
+    RESUME_RECONCILE_GRACE_SECONDS: float = 3600.0
+
+    # Jobs queued for every upload and run by `python -m app.CV.worker`.
+    # Failed attempts are retried after RESUME_JOB_RETRY_SECONDS, doubling
+    # each time; a job not finished within the visibility timeout is handed
+    # to another worker
+    RESUME_JOBS: List[str] = ["validate_pdf"]
+    RESUME_JOB_MAX_ATTEMPTS: int = 5
+    RESUME_JOB_RETRY_SECONDS: float = 30.0
+    RESUME_JOB_VISIBILITY_TIMEOUT_SECONDS: float = 300.0
+    RESUME_WORKER_PROCESSES: int = 2
+    RESUME_WORKER_POLL_SECONDS: float = 1.0
+
+    # Seconds between incremental reloads of the revoked-token cache
+    REVOKED_TOKEN_CACHE_REFRESH_SECONDS: float = 5.0
+    # Rows blacklisted this long before the newest one seen are read again on
+    # each reload; must exceed the longest logout transaction
+    REVOKED_TOKEN_CACHE_OVERLAP_SECONDS: float = 60.0
+
+    # Expired blacklisted tokens are purged in the background (0 disables)
+    TOKEN_PURGE_INTERVAL_SECONDS: float = 300.0
+    TOKEN_PURGE_BATCH_SIZE: int = 1000
+
+    # Authenticated user records cached per process (0 TTL disables)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # bcrypt runs on a bounded pool; workers default to min(4, cpu count), 0 runs inline.
+    # passlib's os_crypt backend holds the GIL, so a process pool is the default
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "process"
+
+    # "app.sql" logger: statements over the threshold log at WARNING (0 disables),
+    # a sampled fraction of the rest at INFO. SQL_ECHO restores SQLAlchemy's echo
+    SQL_LOG_LEVEL: str = "WARNING"
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_ECHO: bool = False
+    # In development, warn when one request issues the same statement this often
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 3
     
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.parent / ".env", 
@@ -1,25 +1,89 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.core.db_pool import pool_options, register_pool_metrics
+from app.core.replicas import ReplicaSet
+from app.core.sql_logging import install_sql_logging
 
+# Async driver used for each backend when the configured URL names a sync one
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> URL:
+    """Translate a sync database URL (e.g. psycopg2) to its async driver"""
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+# Sync engine, kept for Alembic, CLI tools and background threads
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True
+    echo=settings.SQL_ECHO,
+    **pool_options(settings.SQLALCHEMY_DATABASE_URL, "sync"),
     # connect_args={"check_same_thread": False} # Just for Sqlite
 )
 
 session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routers
+ASYNC_DATABASE_URL = settings.SQLALCHEMY_ASYNC_DATABASE_URL or to_async_url(
+    settings.SQLALCHEMY_DATABASE_URL
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.SQL_ECHO,
+    **pool_options(ASYNC_DATABASE_URL, "primary", is_async=True),
+)
+
+replica_engines = []
+for index, replica_url in enumerate(settings.SQLALCHEMY_REPLICA_URLS):
+    replica_url = to_async_url(replica_url)
+    replica_engines.append(
+        create_async_engine(
+            replica_url,
+            echo=settings.SQL_ECHO,
+            **pool_options(replica_url, f"replica{index}", is_async=True),
+        )
+    )
+
+install_sql_logging(engine)
+install_sql_logging(async_engine.sync_engine)
+register_pool_metrics(engine, "sync")
+register_pool_metrics(async_engine.sync_engine, "primary")
+for index, replica_engine in enumerate(replica_engines):
+    install_sql_logging(replica_engine.sync_engine)
+    register_pool_metrics(replica_engine.sync_engine, f"replica{index}")
+
+read_replicas = ReplicaSet(
+    async_engine,
+    replica_engines,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    check_timeout=settings.REPLICA_CHECK_TIMEOUT_SECONDS,
+)
+
+async_session_local = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = session_local()
+async def get_db():
+    async with async_session_local() as db:
+        yield db
+
 
-    try:
+async def get_read_db():
+    """Session for read-only endpoints, on a healthy replica when configured"""
+    async with await read_replicas.session() as db:
         yield db
-    finally:
-        db.close()
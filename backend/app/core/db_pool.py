@@ -0,0 +1,100 @@
+"""Connection pool options from Settings and live pool metrics"""
+
+import time
+from typing import Any, Callable, Dict, Type, Union
+
+from sqlalchemy import exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import metrics
+from app.core.config import settings
+
+pool_size = metrics.gauge(
+    "db_pool_size", "Configured number of persistent connections", ("pool",)
+)
+pool_checked_out = metrics.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ("pool",)
+)
+pool_overflow = metrics.gauge(
+    "db_pool_overflow", "Overflow connections currently open beyond pool_size", ("pool",)
+)
+pool_checkout_seconds = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+pool_checkout_timeouts = metrics.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    ("pool",),
+)
+
+
+def _instrumented(base: Type[QueuePool], name: str) -> Type[QueuePool]:
+    """Subclass of a queue pool that times every checkout under the `name` label"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc(pool=name)
+            raise
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - started, pool=name)
+
+    # pool.recreate() (engine.dispose) instantiates self.__class__ again, so the
+    # label lives on the class rather than on the instance. The module keeps
+    # SQLAlchemy's pool logger under "sqlalchemy.pool" rather than "app"
+    return type(
+        f"Instrumented{base.__name__}",
+        (base,),
+        {"_do_get": _do_get, "__module__": base.__module__},
+    )
+
+
+def pool_options(url: Union[str, URL], name: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments for the pool"""
+    url = make_url(url)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    # in-memory sqlite keeps SQLAlchemy's single-connection pool
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    options.update(
+        poolclass=_instrumented(base, name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def register_pool_metrics(engine: Engine, name: str) -> Callable[[], None]:
+    """
+    Sample the engine's current pool on every /metrics scrape. Returns a
+    function that stops sampling and drops the pool's series, for engines
+    disposed before the process ends.
+    """
+
+    def collect():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        pool_size.set(pool.size(), pool=name)
+        pool_checked_out.set(pool.checkedout(), pool=name)
+        # overflow() counts down from -pool_size while persistent slots are free
+        pool_overflow.set(max(pool.overflow(), 0), pool=name)
+
+    metrics.REGISTRY.on_collect(collect)
+
+    def unregister():
+        metrics.REGISTRY.remove_collector(collect)
+        for gauge in (pool_size, pool_checked_out, pool_overflow):
+            gauge.remove(pool=name)
+
+    return unregister
@@ -0,0 +1,222 @@
+"""File responses that answer conditional and byte-range requests (RFC 9110)"""
+
+import os
+import stat
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from secrets import token_hex
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# More ranges than this in one request are ignored and the whole file is sent
+MAX_RANGES = 16
+
+
+def parse_byte_ranges(value: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Sorted, coalesced [start, end) ranges of a Range header for a file of
+    `size` bytes. None when the header is invalid or asks for too many ranges
+    (the header is then ignored), an empty list when no range is satisfiable.
+    """
+    units, _, spec = value.partition("=")
+    if units.strip().lower() != "bytes" or not spec.strip():
+        return None
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if not parts or len(parts) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for part in parts:
+        first, dash, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            if not last:
+                return None
+            if int(last) > 0 and size > 0:
+                ranges.append((max(size - int(last), 0), size))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last) + 1, size) if last else size))
+
+    ranges.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class ConditionalFileResponse(FileResponse):
+    """
+    FileResponse with a caller-supplied strong ETag and Cache-Control that
+    answers If-None-Match / If-Modified-Since with 304, honours If-Range, and
+    sends multiple ranges as a well-formed multipart/byteranges body. Invalid
+    Range headers are ignored rather than rejected.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        etag: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        **kwargs,
+    ):
+        super().__init__(path, **kwargs)
+        if etag:
+            self.headers["etag"] = f'"{etag}"'
+        if cache_control:
+            self.headers["cache-control"] = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            try:
+                self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+            if not stat.S_ISREG(self.stat_result.st_mode):
+                raise RuntimeError(f"File at path {self.path} is not a file.")
+            self.set_stat_headers(self.stat_result)
+
+        request_headers = Headers(scope=scope)
+        send_header_only = scope["method"].upper() == "HEAD"
+        size = self.stat_result.st_size
+
+        if self._not_modified(request_headers):
+            kept = ("etag", "last-modified", "cache-control")
+            headers = {name: self.headers[name] for name in kept if name in self.headers}
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        ranges = self._requested_ranges(request_headers, size)
+        if ranges is None:
+            send_pathsend = "http.response.pathsend" in scope.get("extensions", {})
+            await self._handle_simple(send, send_header_only, send_pathsend)
+        elif not ranges:
+            response = Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+            await response(scope, receive, send)
+            return
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            await self._handle_single_range(send, start, end, size, send_header_only)
+        else:
+            await self._send_byteranges(send, ranges, size, send_header_only)
+
+        if self.background is not None:
+            await self.background()
+
+    def _not_modified(self, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque_tag(self.headers["etag"]) in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+    def _requested_ranges(
+        self, request_headers: Headers, size: int
+    ) -> Optional[List[Tuple[int, int]]]:
+        http_range = request_headers.get("range")
+        if http_range is None:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range is not None:
+            # If-Range needs a strong validator match, else the full file is sent
+            if if_range.startswith(("W/", '"')):
+                if if_range != self.headers["etag"]:
+                    return None
+            elif if_range != self.headers["last-modified"]:
+                return None
+        return parse_byte_ranges(http_range, size)
+
+    async def _send_byteranges(
+        self, send: Send, ranges: List[Tuple[int, int]], size: int, send_header_only: bool
+    ) -> None:
+        boundary = token_hex(13)
+        content_type = self.headers["content-type"]
+        part_headers = []
+        for i, (start, end) in enumerate(ranges):
+            delimiter = f"--{boundary}" if i == 0 else f"\r\n--{boundary}"
+            part_headers.append(
+                f"{delimiter}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{end - 1}/{size}\r\n\r\n".encode("latin-1")
+            )
+        closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(
+            sum(map(len, part_headers)) + sum(end - start for start, end in ranges) + len(closing)
+        )
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for header, (start, end) in zip(part_headers, ranges):
+                await send({"type": "http.response.body", "body": header, "more_body": True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def offloaded_file_response(
+    path: Path,
+    root: Path,
+    mode: str,
+    prefix: str,
+    filename: str,
+    media_type: str,
+    cache_control: Optional[str] = None,
+) -> Optional[Response]:
+    """
+    Empty response telling the front proxy to send `path` itself: an
+    X-Accel-Redirect to `prefix` + the path below `root` (nginx), or an
+    X-Sendfile with the absolute path (Apache, lighttpd). None when offloading
+    is off or the file is outside `root`; the caller then streams it.
+    """
+    if mode == "none":
+        return None
+    path = path.resolve()
+    try:
+        relative = path.relative_to(root.resolve())
+    except ValueError:
+        return None
+
+    headers = {"content-disposition": content_disposition(filename)}
+    if cache_control:
+        headers["cache-control"] = cache_control
+    if mode == "x-accel-redirect":
+        headers["x-accel-redirect"] = prefix + quote(relative.as_posix())
+    else:
+        headers["x-sendfile"] = str(path)
+    return Response(media_type=media_type, headers=headers)
@@ -0,0 +1,188 @@
+"""
+JSON log records written off the request path: handlers only enqueue, a
+QueueListener thread formats and writes them to stdout, one ECS-shaped JSON
+object per line for the logstash pipeline.
+"""
+
+import copy
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.request_context import current_request
+
+SERVICE_NAME = "resume-review-backend"
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+records_dropped = metrics.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+records_suppressed = metrics.counter(
+    "log_records_suppressed_total", "Repeated log records dropped by the rate limit"
+)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Copies the identity of the current request onto the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        info = current_request.get()
+        for name in ("request_id", "route", "user_id"):
+            if not hasattr(record, name):
+                setattr(record, name, getattr(info, name, None))
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `limit` identical records through per `window` seconds, where
+    identical means same logger, level, message template, route and exception
+    type. The first record let through after a suppressed run carries the
+    number of dropped repeats in `suppressed`.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self, limit: int, window: float, exempt: Tuple[str, ...] = ()):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.exempt = exempt
+        # key -> [window start, records let through, records suppressed]
+        self._seen: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.name in self.exempt:
+            return True
+        key = (
+            record.name,
+            record.levelno,
+            str(record.msg),
+            getattr(record, "route", None),
+            record.exc_info[0] if record.exc_info else None,
+        )
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if entry is None and len(self._seen) >= self.MAX_KEYS:
+                    self._prune(now)
+                self._seen[key] = [now, 1, 0]
+                if entry is not None and entry[2]:
+                    record.suppressed = int(entry[2])
+                return True
+            if entry[1] < self.limit:
+                entry[1] += 1
+                return True
+            entry[2] += 1
+        records_suppressed.inc()
+        return False
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, v in self._seen.items() if now - v[0] >= self.window]
+        for key in expired or list(self._seen)[: self.MAX_KEYS // 2]:
+            del self._seen[key]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with ECS field names and the request context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "@timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "log.level": record.levelname.lower(),
+            "log.logger": record.name,
+            "message": record.getMessage(),
+            "service.name": SERVICE_NAME,
+            "process.pid": record.process,
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and value is not None:
+                payload[name] = value
+        if record.exc_text:
+            payload["error.stack_trace"] = record.exc_text
+        return orjson.dumps(payload, default=str).decode()
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Renders what cannot cross threads and never blocks on a full queue"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            records_dropped.inc()
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        if record.exc_text and record.exc_text not in text:
+            text = f"{text}\n{record.exc_text}"
+        return text
+
+
+def setup_logging() -> None:
+    """Route records of the root logger through the queue (idempotent)"""
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(_TextFormatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _handler = _NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(RequestContextFilter())
+    _handler.addFilter(
+        RateLimitFilter(
+            settings.LOG_RATE_LIMIT_COUNT,
+            settings.LOG_RATE_LIMIT_WINDOW_SECONDS,
+            exempt=("app.access",),
+        )
+    )
+    logging.getLogger().addHandler(_handler)
+    logging.getLogger("app").setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, stream)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the handler"""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _listener = _handler = None
@@ -0,0 +1,134 @@
+"""Raw ASGI middleware timing every request and exporting HTTP metrics"""
+
+import logging
+import os
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.request_context import (
+    QueryStats,
+    RequestInfo,
+    current_query_stats,
+    current_request,
+    current_route,
+)
+from app.core.sql_logging import log_repeated_statements
+
+requests_total = metrics.counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its last body chunk",
+    ("method", "route"),
+)
+requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+request_bytes = metrics.counter(
+    "http_request_bytes_total", "Request body bytes received", ("method", "route")
+)
+response_bytes = metrics.counter(
+    "http_response_bytes_total", "Response body bytes sent", ("method", "route")
+)
+
+access_logger = logging.getLogger("app.access")
+
+# Label for requests that matched no route, so 404 scans don't add series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def request_id_from(scope: Scope) -> str:
+    """X-Request-ID set by the proxy, or a new one"""
+    for name, value in scope["headers"]:
+        if name == b"x-request-id" and 0 < len(value) <= 128:
+            return value.decode("latin-1")
+    return uuid.uuid4().hex
+
+
+class RequestMetricsMiddleware:
+    """
+    Sets X-Process-Time (time until the response starts), X-Request-ID and the
+    per-request query counters, records latency, status, in-flight and byte
+    metrics per route template and writes one access log record per request.
+    Works on raw ASGI messages, so streamed and file responses pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        development = os.getenv("ENVIRONMENT") == "development"
+        stats = QueryStats(track_statements=development)
+        info = RequestInfo(request_id_from(scope), scope)
+        route_token = current_route.set(f"{method} {scope['path']}")
+        request_token = current_request.set(info)
+        stats_token = current_query_stats.set(stats)
+        start_time = time.perf_counter()
+        status_code = 500
+        received = sent = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, sent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+                headers["X-Request-ID"] = info.request_id
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time"] = f"{stats.duration_ms / 1000:.6f}"
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            duration = time.perf_counter() - start_time
+            route = info.route or UNMATCHED_ROUTE
+            request_duration.observe(duration, method=method, route=route)
+            requests_total.inc(method=method, route=route, status=str(status_code))
+            request_bytes.inc(received, method=method, route=route)
+            response_bytes.inc(sent, method=method, route=route)
+            if development:
+                log_repeated_statements(stats, settings.SQL_REPEATED_STATEMENT_THRESHOLD)
+            if settings.LOG_ACCESS_REQUESTS:
+                access_logger.info(
+                    "%s %s %d",
+                    method,
+                    info.path,
+                    status_code,
+                    extra={
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 3),
+                        "method": method,
+                        "path": info.path,
+                        "request_bytes": received,
+                        "response_bytes": sent,
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.duration_ms, 3),
+                    },
+                )
+            current_query_stats.reset(stats_token)
+            current_request.reset(request_token)
+            current_route.reset(route_token)
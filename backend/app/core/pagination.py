@@ -0,0 +1,30 @@
+"""Opaque cursors for keyset pagination on (timestamp, id)"""
+
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Tuple
+
+from fastapi import HTTPException
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; aware values are converted to match"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(created_date: datetime, row_id: int) -> str:
+    raw = f"{created_date.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor, 400 for anything a client should not have sent"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_date, row_id = raw.split("|")
+        return naive_utc(datetime.fromisoformat(created_date)), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
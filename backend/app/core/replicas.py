@@ -0,0 +1,115 @@
+"""Routing of read-only sessions across replicas with fallback to the primary"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+replica_healthy = metrics.gauge(
+    "db_replica_healthy", "1 when the replica is reachable and within the lag limit", ("replica",)
+)
+replica_lag_seconds = metrics.gauge(
+    "db_replica_lag_seconds", "Replication lag measured at the last health check", ("replica",)
+)
+read_sessions = metrics.counter(
+    "db_read_sessions_total", "Read-only sessions opened per target", ("target",)
+)
+
+# Replay delay, or 0 when the replica has applied everything it received (an
+# idle primary would otherwise look like a lagging replica)
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """One replica engine and the outcome of its last health check"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = float("-inf")
+        self.lock = asyncio.Lock()
+
+
+class ReplicaSet:
+    """
+    Round-robin over replicas that passed their last health check. A replica is
+    re-checked when its result is older than `check_interval`; it is skipped while
+    unreachable or lagging more than `max_lag` seconds. Without a usable replica,
+    sessions go to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float,
+    ):
+        self.primary = primary
+        self.replicas = [Replica(f"replica{i}", e) for i, e in enumerate(replicas)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._next = itertools.count()
+
+    async def _lag(self, engine: AsyncEngine) -> float:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(await conn.scalar(POSTGRES_LAG_QUERY))
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    async def check(self, replica: Replica) -> bool:
+        """Refresh the replica's health if the last check is stale"""
+        if time.monotonic() - replica.checked_at < self.check_interval:
+            return replica.healthy
+        async with replica.lock:
+            if time.monotonic() - replica.checked_at < self.check_interval:
+                return replica.healthy
+            try:
+                lag = await asyncio.wait_for(self._lag(replica.engine), self.check_timeout)
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning("Read replica %s unavailable: %s", replica.name, e)
+                replica.healthy = False
+            else:
+                replica_lag_seconds.set(lag, replica=replica.name)
+                if lag > self.max_lag and replica.healthy:
+                    logger.warning("Read replica %s lagging %.1fs", replica.name, lag)
+                replica.healthy = lag <= self.max_lag
+            replica.checked_at = time.monotonic()
+            replica_healthy.set(int(replica.healthy), replica=replica.name)
+            return replica.healthy
+
+    async def pick(self) -> Optional[Replica]:
+        """Next healthy replica in round-robin order, None when all are unusable"""
+        count = len(self.replicas)
+        start = next(self._next)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if await self.check(replica):
+                return replica
+        return None
+
+    async def session(self) -> AsyncSession:
+        replica = await self.pick()
+        read_sessions.inc(target=replica.name if replica else "primary")
+        engine = replica.engine if replica else self.primary
+        return AsyncSession(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
@@ -0,0 +1,56 @@
+"""Per-request values visible to code that has no access to the Request object"""
+
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestInfo:
+    """Identity of the request being served, filled in as it is processed"""
+
+    def __init__(self, request_id: str, scope: dict):
+        self.request_id = request_id
+        self.method: str = scope["method"]
+        self.path: str = scope["path"]
+        self._scope = scope
+        # Set by get_authenticated_user
+        self.user_id: Optional[int] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        """Path template of the matched route, None before routing or on 404"""
+        return getattr(self._scope.get("route"), "path", None)
+
+
+class QueryStats:
+    """Statements issued while serving one request and their cumulative time"""
+
+    def __init__(self, track_statements: bool = False):
+        self.count = 0
+        self.duration_ms = 0.0
+        # Only kept when repeated statements should be reported (development)
+        self.statements: Optional[Counter] = Counter() if track_statements else None
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.duration_ms += duration_ms
+        if self.statements is not None:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements issued at least `threshold` times, most frequent first"""
+        if self.statements is None:
+            return []
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+
+# "METHOD /path" of the request being served, None outside a request
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+current_request: ContextVar[Optional[RequestInfo]] = ContextVar(
+    "current_request", default=None
+)
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
@@ -0,0 +1,40 @@
+"""Bulk JSON serialization of projected query rows for the listing endpoints"""
+
+from typing import Generic, List, Sequence, Type, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+from app.core.config import settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class RowSerializer(Generic[ModelT]):
+    """
+    Turns rows selected with exactly the schema's columns into JSON bytes using
+    precompiled TypeAdapters, instead of building one model per row that FastAPI
+    then validates again through response_model. With LISTING_VALIDATE_ROWS off
+    the rows are serialized without validation at all.
+    """
+
+    def __init__(self, model: Type[ModelT]):
+        self.model = model
+        self._one = TypeAdapter(model)
+        self._many = TypeAdapter(List[model])
+
+    def dump_one(self, row: Row) -> bytes:
+        if settings.LISTING_VALIDATE_ROWS:
+            return self._one.dump_json(self._one.validate_python(row, from_attributes=True))
+        return self._one.dump_json(row._asdict(), warnings=False)
+
+    def dump_many(self, rows: Sequence[Row]) -> bytes:
+        if settings.LISTING_VALIDATE_ROWS:
+            return self._many.dump_json(
+                self._many.validate_python(rows, from_attributes=True)
+            )
+        return self._many.dump_json([row._asdict() for row in rows], warnings=False)
+
+    def response(self, rows: Sequence[Row], **kwargs) -> Response:
+        return Response(self.dump_many(rows), media_type="application/json", **kwargs)
@@ -0,0 +1,98 @@
+"""
+Engine event hooks timing every statement: sampled statement logging, the
+slow-query log and the per-request query counters.
+"""
+
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.request_context import current_query_stats, current_route
+
+logger = logging.getLogger("app.sql")
+logger.setLevel(settings.SQL_LOG_LEVEL.upper())
+
+MAX_LOGGED_SQL = 2000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# bound parameter placeholders of the sqlite, asyncpg and psycopg2 dialects,
+# after number literals were replaced
+_IN_LIST = re.compile(
+    r"\bIN \((?: ?(?:\?|\$\?|%s|%\(\w+\)s) ?,?)+\)",
+    re.I,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace literals so equal queries log identically"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("IN (...)", sql)
+    if len(sql) > MAX_LOGGED_SQL:
+        sql = sql[:MAX_LOGGED_SQL] + "..."
+    return sql
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+
+    slow_ms = settings.SQL_SLOW_QUERY_MS
+    if slow_ms and duration_ms >= slow_ms:
+        level, message = logging.WARNING, "Slow query %.1f ms on %s: %s"
+    elif (
+        settings.SQL_LOG_SAMPLE_RATE > 0
+        and logger.isEnabledFor(logging.INFO)
+        and random.random() < settings.SQL_LOG_SAMPLE_RATE
+    ):
+        level, message = logging.INFO, "Query %.1f ms on %s: %s"
+    else:
+        return
+
+    route = current_route.get()
+    sql = normalize_sql(statement)
+    logger.log(
+        level,
+        message,
+        duration_ms,
+        route or "-",
+        sql,
+        extra={"duration_ms": round(duration_ms, 3), "sql": sql, "route": route},
+    )
+
+
+def log_repeated_statements(stats, threshold: int) -> None:
+    """Warn about statements issued `threshold`+ times in one request (likely N+1)"""
+    for statement, times in stats.repeated(threshold):
+        sql = normalize_sql(statement)
+        logger.warning(
+            "Statement repeated %d times on %s: %s",
+            times,
+            current_route.get() or "-",
+            sql,
+            extra={"repeat_count": times, "sql": sql, "route": current_route.get()},
+        )
+
+
+def install_sql_logging(engine: Engine) -> None:
+    """Attach the hooks to a sync engine (use async_engine.sync_engine for async)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
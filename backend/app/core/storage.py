@@ -0,0 +1,247 @@
+"""
+File storage behind a small interface so API replicas need not share a volume.
+Drivers are synchronous; async callers run them with asyncio.to_thread.
+"""
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+
+
+class Storage(ABC):
+    """Objects addressed by key, filled from local files"""
+
+    @abstractmethod
+    def store(self, key: str, source: Path, keep_source: bool = False) -> None:
+        """Store `source` under `key`, removing `source` unless keep_source"""
+
+    @abstractmethod
+    def copy(self, source_key: str, key: str) -> None:
+        """Copy an object within the store, leaving the source in place"""
+
+    @abstractmethod
+    def fetch(self, key: str, destination: Path) -> None:
+        """Copy the object into the local file `destination`"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object; a missing object is not an error"""
+
+    @abstractmethod
+    def iter_objects(self) -> Iterator[Tuple[str, float]]:
+        """(key, last modified timestamp) of every object, in key order"""
+
+    @abstractmethod
+    def location(self, key: str) -> str:
+        """Where the object lives, as recorded in Resume.file_path"""
+
+    @abstractmethod
+    def key_for(self, location: str) -> Optional[str]:
+        """Key of an object from its location, None if it is not in this store"""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path the API can serve the object from, if any"""
+        return None
+
+    def download_url(
+        self, key: str, filename: str, content_type: str
+    ) -> Optional[str]:
+        """Time-limited URL clients can fetch the object from directly, if any"""
+        return None
+
+
+class LocalStorage(Storage):
+    """Objects as files below one directory; keys may contain slashes"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / key
+
+    def store(self, key: str, source: Path, keep_source: bool = False) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not keep_source:
+            os.replace(source, target)
+            return
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copy2(source, target)
+
+    def copy(self, source_key: str, key: str) -> None:
+        self.store(key, self.path(source_key), keep_source=True)
+
+    def fetch(self, key: str, destination: Path) -> None:
+        shutil.copyfile(self.path(key), destination)
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    def iter_objects(self) -> Iterator[Tuple[str, float]]:
+        # Entries of one directory are sorted in memory, subdirectories as
+        # "name/" so keys come out in plain string order. Dot files (staged
+        # uploads, checkpoints) are not objects. ctime counts as a change so
+        # fresh hard links look new.
+        def walk(directory: str, prefix: str) -> Iterator[Tuple[str, float]]:
+            with os.scandir(directory) as it:
+                entries = [entry for entry in it if not entry.name.startswith(".")]
+            entries.sort(key=lambda e: e.name + "/" if e.is_dir() else e.name)
+            for entry in entries:
+                if entry.is_dir():
+                    yield from walk(entry.path, f"{prefix}{entry.name}/")
+                else:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # deleted since the listing
+                        continue
+                    yield prefix + entry.name, max(stat.st_mtime, stat.st_ctime)
+
+        if not self.directory.is_dir():
+            return iter(())
+        return walk(str(self.directory), "")
+
+    def location(self, key: str) -> str:
+        return str(self.path(key))
+
+    def key_for(self, location: str) -> Optional[str]:
+        try:
+            return Path(location).relative_to(self.directory).as_posix()
+        except ValueError:
+            return None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.path(key)
+
+
+class S3Storage(Storage):
+    """
+    Objects in an S3-compatible bucket (AWS, MinIO). Files larger than
+    `chunk_size` are sent as multipart uploads; downloads are presigned GET
+    URLs valid for `url_expires` seconds.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        chunk_size: int = 8 * 1024 * 1024,
+        url_expires: int = 300,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expires = url_expires
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size, multipart_chunksize=chunk_size
+        )
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def store(self, key: str, source: Path, keep_source: bool = False) -> None:
+        self.client.upload_file(
+            str(source), self.bucket, self.object_key(key), Config=self.transfer_config
+        )
+        if not keep_source:
+            os.remove(source)
+
+    def copy(self, source_key: str, key: str) -> None:
+        self.client.copy(
+            {"Bucket": self.bucket, "Key": self.object_key(source_key)},
+            self.bucket,
+            self.object_key(key),
+            Config=self.transfer_config,
+        )
+
+    def fetch(self, key: str, destination: Path) -> None:
+        self.client.download_file(
+            self.bucket, self.object_key(key), str(destination), Config=self.transfer_config
+        )
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def iter_objects(self) -> Iterator[Tuple[str, float]]:
+        # listings come back in UTF-8 binary key order, one page at a time
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", ()):
+                yield item["Key"][len(self.prefix):], item["LastModified"].timestamp()
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self.object_key(key)}"
+
+    def key_for(self, location: str) -> Optional[str]:
+        base = self.location("")
+        return location[len(base):] if location.startswith(base) else None
+
+    def download_url(
+        self, key: str, filename: str, content_type: str
+    ) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.object_key(key),
+                "ResponseContentType": content_type,
+                "ResponseContentDisposition": (
+                    f"attachment; filename*=utf-8''{quote(filename)}"
+                ),
+            },
+            ExpiresIn=self.url_expires,
+        )
+
+
+def build_storage(local_directory: Path) -> Storage:
+    """The driver selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            chunk_size=settings.S3_MULTIPART_CHUNK_BYTES,
+            url_expires=settings.S3_PRESIGNED_URL_EXPIRES_SECONDS,
+        )
+    return LocalStorage(local_directory)
@@ -1,15 +1,27 @@
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Response, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.CV.routes import router as cv_routes
 from app.users.routes import router as users_routes
 from app.admin.routes import router as admin_routes
-import time
+from app.core import metrics
+from app.core.database import async_engine, read_replicas
+from app.core.middleware import RequestMetricsMiddleware
+from app.core.json_logging import setup_logging, shutdown_logging
+from sqlalchemy import text
+from app.auth.token_purge import start_purge_worker
+from app.CV.reconcile import start_reconcile_worker
+from app.auth.password_hashing import password_hasher
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger("app")
+
 tags_metadata = [
     {
         "name": "DevSepOps",
@@ -25,30 +37,44 @@ tags_metadata = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Simple lifespan without auto-migration"""
-    print("🚀 Application starting up...")
+    setup_logging()
+    logger.info("Application starting up")
 
     try:
-        from app.core.database import engine
-        from sqlalchemy import text
-
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        print("🔗 Database connection successful")
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        logger.info("Database connection successful")
 
     except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+        logger.error("Database connection failed: %s", e)
         if os.getenv("ENVIRONMENT") == "development":
+            shutdown_logging()
             raise
 
-    print("🎯 Application is ready to handle requests")
+    purge_task = start_purge_worker()
+    reconcile_task = start_reconcile_worker()
+
+    logger.info("Application is ready to handle requests")
 
     yield
 
-    print("🛑 Application shutting down...")
+    logger.info("Application shutting down")
+
+    for task in (purge_task, reconcile_task):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    password_hasher.shutdown()
+    await read_replicas.dispose()
+    await async_engine.dispose()
+    shutdown_logging()
 
 
 app = FastAPI(
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_tags=tags_metadata,
     title="DevSepOps Resume API",
     description="Learn DevOps in easiest way with Sep - Resume Review System",
@@ -76,6 +102,14 @@ async def root():
     return {"message": "Resume Review API"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
 # in case of cookie management
 @app.post("/set-cookie", tags=["Cookie management"])
 def set_cookie(response: Response):
@@ -88,15 +122,8 @@ def get_cookie(request: Request):
     return {"Requested cookie": request.cookies.get("test")}
 
 
-# Calculating process time
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
+# Process time header and HTTP metrics
+app.add_middleware(RequestMetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -109,23 +136,37 @@ app.add_middleware(
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request, exc):
-    print(exc.__dict__)
+    logger.log(
+        logging.ERROR if exc.status_code >= 500 else logging.INFO,
+        "HTTP %s: %s",
+        exc.status_code,
+        exc.detail,
+        extra={"status": exc.status_code},
+    )
     error_response = {
         "error": True,
         "status_code": exc.status_code,
         "detail": exc.detail,
     }
-    return JSONResponse(status_code=exc.status_code, content=error_response)
+    return ORJSONResponse(status_code=exc.status_code, content=error_response)
 
 
 @app.exception_handler(RequestValidationError)
 async def http_validation_handler(request, exc):
-    print(exc.__dict__)
+    errors = jsonable_encoder(exc.errors())
+    # rejected input may hold passwords, only its location is logged
+    logger.warning(
+        "Request validation failed",
+        extra={
+            "status": status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "errors": [{"loc": e["loc"], "type": e["type"]} for e in errors],
+        },
+    )
     error_response = {
         "error": True,
         "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
-        "detail": exc.errors(),
+        "detail": errors,
     }
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=error_response
     )
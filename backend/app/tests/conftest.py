@@ -1,32 +1,66 @@
 import pytest
+import asyncio
 import os
+import shutil
 import sys
+import tempfile
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_read_db, Base
 from app.main import app
 from app.core.config import settings
+from app.auth.token_cache import revoked_tokens
+from app.auth.principal_cache import principals
+from app.core.sql_logging import install_sql_logging
+from app.auth.password_hashing import password_hasher
 
-# DB test on sqlite in memory
-TEST_DATABASE_URL = "sqlite:///:memory:"
+# DB test on a temporary sqlite file, shared by the sync session used to seed
+# data and the async session the app uses; removed when the session ends
+TEST_DATABASE_DIR = tempfile.mkdtemp()
+TEST_DATABASE_FILE = os.path.join(TEST_DATABASE_DIR, "test.db")
+TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_FILE}"
+TEST_ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_FILE}"
 
 engine = create_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: aiosqlite connections are bound to the event loop that opened them
+async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+install_sql_logging(async_engine.sync_engine)
+
+# Every API test starts the app and its hashing pool afresh; fork-server
+# workers would add interpreter start-up to each. The process pool itself is
+# covered in test_password_hashing
+password_hasher.executor_type = "thread"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database_dir():
+    """Remove the test database and its directory after the session"""
+    yield
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+    shutil.rmtree(TEST_DATABASE_DIR, ignore_errors=True)
+
 
 @pytest.fixture(scope="function")
 def test_db():
     """Test db fixture"""
     Base.metadata.create_all(bind=engine)
+    revoked_tokens.clear()
+    principals.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -35,22 +69,49 @@ def test_db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+def run_with_db(test_db):
+    """Run an async function with an AsyncSession on the test db as last argument"""
+
+    def runner(fn, *args):
+        async def main():
+            async with TestingAsyncSessionLocal() as db:
+                return await fn(*args, db)
+
+        return asyncio.run(main())
+
+    return runner
+
+
 @pytest.fixture(scope="function")
 def client(test_db):
     """Test client fixture"""
 
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def assert_max_queries():
+    """Check the X-DB-Query-Count of a response against an upper bound"""
+
+    def check(response, limit):
+        count = int(response.headers["X-DB-Query-Count"])
+        assert count <= limit, (
+            f"{response.request.method} {response.request.url.path} "
+            f"issued {count} queries, expected at most {limit}"
+        )
+
+    return check
+
+
 @pytest.fixture
 def sample_user_data():
     """User sample"""
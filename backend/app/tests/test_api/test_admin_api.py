@@ -0,0 +1,83 @@
+import pytest
+from app.tests.factories.user_factory import UserFactory
+
+
+def login(client, username, password):
+    response = client.post(
+        "/users/login", json={"username": username, "password": password}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestAdminAPI:
+    """Test admin endpoints"""
+
+    def test_role_change_applies_immediately(self, client, test_db):
+        """Cached principals are invalidated when an admin changes a role"""
+        admin = UserFactory.create_admin(
+            username="adminuser", email="admin@example.com", password="adminpass123"
+        )
+        user = UserFactory.create(
+            username="promoteduser", email="promoted@example.com", password="userpass123"
+        )
+        test_db.add_all([admin, user])
+        test_db.commit()
+
+        admin_headers = login(client, "adminuser", "adminpass123")
+        user_headers = login(client, "promoteduser", "userpass123")
+
+        response = client.get("/resumes/expert/all", headers=user_headers)
+        assert response.status_code == 403
+
+        response = client.patch(
+            f"/admin/users/{user.id}/role", json={"role": "expert"}, headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["role"] == "expert"
+
+        response = client.get("/resumes/expert/all", headers=user_headers)
+        assert response.status_code == 200
+
+    def test_deactivation_applies_immediately(self, client, test_db):
+        """A deactivated user is rejected on the next request"""
+        admin = UserFactory.create_admin(
+            username="adminuser2", email="admin2@example.com", password="adminpass123"
+        )
+        user = UserFactory.create(
+            username="deactivated", email="deactivated@example.com", password="userpass123"
+        )
+        test_db.add_all([admin, user])
+        test_db.commit()
+
+        admin_headers = login(client, "adminuser2", "adminpass123")
+        user_headers = login(client, "deactivated", "userpass123")
+
+        assert client.get("/resumes/my-resumes", headers=user_headers).status_code == 200
+
+        response = client.patch(
+            f"/admin/users/{user.id}/activation", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["is_active"] is False
+
+        assert client.get("/resumes/my-resumes", headers=user_headers).status_code == 401
+
+    def test_system_stats(self, client, test_db):
+        """Admin stats count users per role"""
+        admin = UserFactory.create_admin(
+            username="statsadmin", email="stats@example.com", password="adminpass123"
+        )
+        expert = UserFactory.create_expert(
+            username="statsexpert", email="statsexpert@example.com"
+        )
+        test_db.add_all([admin, expert])
+        test_db.commit()
+
+        headers = login(client, "statsadmin", "adminpass123")
+        response = client.get("/admin/stats", headers=headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_users"] == 2
+        assert data["total_resumes"] == 0
+        assert data["users_by_role"] == {"admin": 1, "expert": 1}
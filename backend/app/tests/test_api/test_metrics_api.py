@@ -0,0 +1,37 @@
+import pytest
+from app.core.middleware import request_duration, requests_in_flight, requests_total
+
+
+class TestMetricsAPI:
+    """Test the request metrics middleware and /metrics"""
+
+    def test_request_is_timed_and_counted(self, client):
+        """Responses carry X-Process-Time and are counted per route template"""
+        before = requests_total.value(method="GET", route="/", status="200")
+
+        response = client.get("/")
+
+        assert response.status_code == 200
+        assert float(response.headers["X-Process-Time"]) > 0
+        assert "X-DB-Query-Count" in response.headers
+        assert requests_total.value(method="GET", route="/", status="200") == before + 1
+        assert requests_in_flight.value() == 0
+
+    def test_route_template_label(self, client):
+        """Path parameters and unknown paths do not create new series"""
+        client.get("/resumes/download/123")
+        client.get("/no/such/path")
+
+        assert request_duration.count(method="GET", route="/resumes/download/{resume_id}")
+        assert requests_total.value(method="GET", route="<unmatched>", status="404")
+
+    def test_metrics_endpoint(self, client):
+        """/metrics renders HTTP metrics in Prometheus text format"""
+        client.get("/")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+        assert "http_response_bytes_total" in response.text
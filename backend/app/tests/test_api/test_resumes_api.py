@@ -1,8 +1,65 @@
 import pytest
+import hashlib
 import io
+import json
+import os
+from datetime import datetime
+from app.CV.models import Resume, ResumeBlob, ResumeJob
+from app.CV.routes import RESUMES_DIR
+from app.core.config import settings
 from app.tests.factories.user_factory import UserFactory
 
 
+def seed_resumes(test_db, owners, per_owner=1):
+    """Give each of `owners` new users `per_owner` resumes, all created at once"""
+    # explicit timestamp: sqlite's server-side now() has no microseconds and
+    # would not compare equal to the cursor's bound datetime
+    created_date = datetime(2026, 1, 1, 12, 0, 0)
+    users = []
+    for i in range(owners):
+        owner = UserFactory.create(username=f"owner{i}", email=f"owner{i}@example.com")
+        owner.resumes = [
+            Resume(
+                file_path=f"uploads/resumes/{i}_{j}.pdf",
+                file_name=f"{i}_{j}.pdf",
+                file_size=1024,
+                mime_type="application/pdf",
+                created_date=created_date,
+            )
+            for j in range(per_owner)
+        ]
+        test_db.add(owner)
+        users.append(owner)
+    test_db.commit()
+    return users
+
+
+def expert_headers(client, test_db):
+    expert = UserFactory.create_expert(
+        username="queryexpert", email="queryexpert@example.com", password="expertpass123"
+    )
+    test_db.add(expert)
+    test_db.commit()
+    login_data = {"username": "queryexpert", "password": "expertpass123"}
+    access_token = client.post("/users/login", json=login_data).json()["access_token"]
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def candidate_headers(client, test_db):
+    user = UserFactory.create(
+        username="uploader", email="uploader@example.com", password="uploadpass123"
+    )
+    test_db.add(user)
+    test_db.commit()
+    login_data = {"username": "uploader", "password": "uploadpass123"}
+    access_token = client.post("/users/login", json=login_data).json()["access_token"]
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def leftover_parts():
+    return list(RESUMES_DIR.glob(".upload-*.part"))
+
+
 class TestResumesAPI:
     """Test resume endpoints"""
 
@@ -36,6 +93,11 @@ class TestResumesAPI:
         assert "resume" in data
         assert data["resume"]["file_name"] == "test_resume.pdf"
 
+        # processing is queued, not run in the request
+        assert data["resume"]["processing_status"] == "pending"
+        jobs = test_db.query(ResumeJob).filter(ResumeJob.resume_id == data["resume"]["id"])
+        assert [(job.kind, job.status) for job in jobs] == [("validate_pdf", "queued")]
+
     def test_upload_non_pdf_file(self, client, test_db):
         """Test uploading non-PDF file using UserFactory"""
         user = UserFactory.create(
@@ -80,3 +142,375 @@ class TestResumesAPI:
 
         assert response.status_code == 200
         assert isinstance(response.json(), list)
+
+    def test_expert_listing_query_count(self, client, test_db, assert_max_queries):
+        """Listing resumes of many users does not issue a query per resume"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 10)
+
+        response = client.get("/resumes/expert/all", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 10
+        assert "X-DB-Time" in response.headers
+        assert int(response.headers["X-DB-Query-Count"]) > 0
+        # revoked-token refresh, principal load, listing
+        assert_max_queries(response, 3)
+
+    def test_expert_listing_pagination(self, client, test_db):
+        """Pages follow X-Next-Cursor, newest first, without gaps or repeats"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 3, per_owner=2)
+        expected = [
+            r["id"] for r in client.get("/resumes/expert/all", headers=headers).json()
+        ]
+        assert len(expected) == 6
+        assert expected == sorted(expected, reverse=True)
+
+        seen, params = [], {"limit": 4}
+        for _ in range(len(expected)):
+            response = client.get("/resumes/expert/all", params=params, headers=headers)
+            assert response.status_code == 200
+            seen += [r["id"] for r in response.json()]
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["X-Next-Cursor"]
+
+        assert seen == expected
+        assert len(seen) == len(set(seen))
+
+    def test_expert_listing_filters(self, client, test_db):
+        """Listing can be narrowed to one user and a date range"""
+        headers = expert_headers(client, test_db)
+        owners = seed_resumes(test_db, 3, per_owner=2)
+
+        response = client.get(
+            "/resumes/expert/all", params={"user_id": owners[1].id}, headers=headers
+        )
+        assert response.status_code == 200
+        assert {r["username"] for r in response.json()} == {"owner1"}
+        assert len(response.json()) == 2
+
+        response = client.get(
+            "/resumes/expert/all",
+            params={"created_to": "2000-01-01T00:00:00"},
+            headers=headers,
+        )
+        assert response.json() == []
+
+        response = client.get(
+            "/resumes/expert/all", params={"cursor": "not-a-cursor"}, headers=headers
+        )
+        assert response.status_code == 400
+
+    def test_expert_listing_timezone_aware_bounds(self, client, test_db):
+        """Bounds with an offset are compared as UTC with the naive timestamps"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 2)
+
+        for params, expected in (
+            ({"created_from": "2026-01-01T12:00:00Z"}, 2),
+            ({"created_to": "2026-01-01T12:00:00Z"}, 0),
+            # 11:30 UTC, before the resumes despite reading 12:30
+            ({"created_from": "2026-01-01T12:30:00+01:00"}, 2),
+        ):
+            response = client.get("/resumes/expert/all", params=params, headers=headers)
+            assert response.status_code == 200
+            assert len(response.json()) == expected
+
+    def test_expert_listing_unpaged_by_default(self, client, test_db):
+        """Without limit or cursor every resume comes back, as before paging"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 1, per_owner=101)
+
+        response = client.get("/resumes/expert/all", headers=headers)
+
+        assert len(response.json()) == 101
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_expert_listing_stream(self, client, test_db):
+        """stream=true returns every resume as NDJSON"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 4, per_owner=3)
+
+        response = client.get(
+            "/resumes/expert/all", params={"stream": True, "limit": 1}, headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 12
+        assert rows[0]["username"].startswith("owner")
+
+    def test_expert_listing_without_row_validation(self, client, test_db, monkeypatch):
+        """Skipping row validation does not change the listing body"""
+        headers = expert_headers(client, test_db)
+        seed_resumes(test_db, 3, per_owner=2)
+
+        validated = client.get("/resumes/expert/all", headers=headers)
+        monkeypatch.setattr(settings, "LISTING_VALIDATE_ROWS", False)
+        trusted = client.get("/resumes/expert/all", headers=headers)
+
+        assert trusted.status_code == 200
+        assert trusted.content == validated.content
+        assert set(trusted.json()[0]) == {
+            "id", "user_id", "file_name", "file_size", "file_path", "mime_type",
+            "processing_status", "created_date", "updated_date", "username", "email", "github",
+        }
+
+    def test_upload_writes_file_in_one_pass(self, client, test_db):
+        """The stored file is the uploaded content and no temporary file remains"""
+        headers = candidate_headers(client, test_db)
+        pdf_content = b"%PDF-1.4 " + bytes(range(256)) * 4096
+        files = {"resume": ("cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+
+        response = client.post(
+            "/resumes/upload", files=files, data={"note": "ignored"}, headers=headers
+        )
+
+        assert response.status_code == 200
+        resume = response.json()["resume"]
+        assert resume["file_size"] == len(pdf_content)
+        with open(resume["file_path"], "rb") as stored:
+            assert hashlib.sha256(stored.read()).digest() == hashlib.sha256(pdf_content).digest()
+        assert leftover_parts() == []
+
+    def test_upload_rejected_from_content_length(self, client, test_db, monkeypatch):
+        """A body declared larger than the limit is refused before it is read"""
+        headers = candidate_headers(client, test_db)
+        monkeypatch.setattr(settings, "RESUME_MAX_BYTES", 1024)
+        pdf_content = b"%PDF-1.4 " + b"x" * (128 * 1024)
+        files = {"resume": ("cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+
+        response = client.post("/resumes/upload", files=files, headers=headers)
+
+        assert response.status_code == 413
+        assert leftover_parts() == []
+
+    def test_upload_too_large_while_streaming(self, client, test_db, monkeypatch):
+        """Without Content-Length the limit is enforced on the data received"""
+        headers = candidate_headers(client, test_db)
+        monkeypatch.setattr(settings, "RESUME_MAX_BYTES", 1024)
+        boundary = "testboundary"
+        body = [
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="resume"; filename="cv.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n".encode(),
+            *(b"x" * 1024 for _ in range(8)),
+            f"\r\n--{boundary}--\r\n".encode(),
+        ]
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+
+        response = client.post("/resumes/upload", content=iter(body), headers=headers)
+
+        assert response.status_code == 413
+        assert leftover_parts() == []
+
+    def test_upload_without_resume_part(self, client, test_db):
+        """A multipart body without the resume file is a client error"""
+        headers = candidate_headers(client, test_db)
+
+        response = client.post(
+            "/resumes/upload", files={"other": ("cv.pdf", b"%PDF", "application/pdf")},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+        assert leftover_parts() == []
+
+    def test_upload_staging_failure(self, client, test_db, monkeypatch, tmp_path):
+        """A staging file that cannot be created is a logged 500, not a crash"""
+        headers = candidate_headers(client, test_db)
+        monkeypatch.setattr("app.CV.routes.RESUMES_DIR", tmp_path / "missing")
+
+        response = client.post(
+            "/resumes/upload", files={"resume": ("cv.pdf", b"%PDF", "application/pdf")},
+            headers=headers,
+        )
+
+        assert response.status_code == 500
+        assert response.json()["detail"] == "File upload failed"
+
+    def test_upload_storage_failure_removes_staged_file(self, client, test_db, monkeypatch):
+        """A failure after the body is staged does not leave the staging file behind"""
+        headers = candidate_headers(client, test_db)
+
+        async def failing_add_reference(*args):
+            raise OSError("store unavailable")
+
+        monkeypatch.setattr("app.CV.routes.add_reference", failing_add_reference)
+
+        with pytest.raises(OSError):
+            client.post(
+                "/resumes/upload", files={"resume": ("cv.pdf", b"%PDF", "application/pdf")},
+                headers=headers,
+            )
+
+        assert leftover_parts() == []
+        assert test_db.query(Resume).count() == 0
+
+    def test_identical_uploads_share_one_blob(self, client, test_db):
+        """Re-uploading the same content reuses the stored file until the last delete"""
+        headers = candidate_headers(client, test_db)
+        pdf_content = b"%PDF-1.4 identical content"
+
+        def upload():
+            files = {"resume": ("cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+            return client.post("/resumes/upload", files=files, headers=headers).json()
+
+        first, second = upload(), upload()
+
+        assert first["deduplicated"] is False
+        assert second["deduplicated"] is True
+        path = first["resume"]["file_path"]
+        assert second["resume"]["file_path"] == path
+        assert path.endswith(hashlib.sha256(pdf_content).hexdigest())
+        assert test_db.get(ResumeBlob, hashlib.sha256(pdf_content).hexdigest()).ref_count == 2
+
+        client.delete(f"/resumes/{first['resume']['id']}", headers=headers)
+        assert os.path.exists(path)
+
+        client.delete(f"/resumes/{second['resume']['id']}", headers=headers)
+        test_db.expire_all()
+        assert not os.path.exists(path)
+        assert test_db.query(ResumeBlob).count() == 0
+
+    def test_failed_delete_keeps_shared_file(self, client, test_db, monkeypatch):
+        """A delete whose commit fails leaves the blob and its file in place"""
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        headers = candidate_headers(client, test_db)
+        pdf_content = b"%PDF-1.4 shared content"
+        files = {"resume": ("cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+        resume = client.post("/resumes/upload", files=files, headers=headers).json()["resume"]
+
+        async def failing_commit(self):
+            raise OSError("database unavailable")
+
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        with pytest.raises(OSError):
+            client.delete(f"/resumes/{resume['id']}", headers=headers)
+        monkeypatch.undo()
+
+        assert os.path.exists(resume["file_path"])
+        assert test_db.get(ResumeBlob, hashlib.sha256(pdf_content).hexdigest()).ref_count == 1
+        assert test_db.get(Resume, resume["id"]) is not None
+
+    def test_download_redirects_to_object_storage(self, client, test_db, monkeypatch):
+        """With the S3 backend uploads go to the bucket and downloads are redirected"""
+        boto3 = pytest.importorskip("boto3")
+        moto = pytest.importorskip("moto")
+        from app.CV import routes
+        from app.core.storage import S3Storage
+
+        headers = candidate_headers(client, test_db)
+        with moto.mock_aws():
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="resumes")
+            storage = S3Storage("resumes", region="us-east-1")
+            monkeypatch.setattr(routes, "resume_storage", storage)
+            files = {"resume": ("cv.pdf", io.BytesIO(b"%PDF-1.4 s3"), "application/pdf")}
+            resume = client.post("/resumes/upload", files=files, headers=headers).json()["resume"]
+
+            response = client.get(
+                f"/resumes/download/{resume['id']}", headers=headers, follow_redirects=False
+            )
+
+            assert resume["file_path"].startswith("s3://resumes/")
+            assert response.status_code == 307
+            assert hashlib.sha256(b"%PDF-1.4 s3").hexdigest() in response.headers["location"]
+            assert "Signature=" in response.headers["location"]
+            assert not RESUMES_DIR.joinpath(hashlib.sha256(b"%PDF-1.4 s3").hexdigest()).exists()
+            assert leftover_parts() == []
+
+    def test_download_conditional_and_ranges(self, client, test_db):
+        """Downloads carry a content ETag, answer revalidation with 304 and serve ranges"""
+        headers = candidate_headers(client, test_db)
+        pdf_content = b"%PDF-1.4 " + bytes(range(256)) * 8
+        files = {"resume": ("cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+        resume_id = client.post("/resumes/upload", files=files, headers=headers).json()["resume"]["id"]
+        url = f"/resumes/download/{resume_id}"
+
+        full = client.get(url, headers=headers)
+        etag = full.headers["etag"]
+        assert full.content == pdf_content
+        assert etag == f'"{hashlib.sha256(pdf_content).hexdigest()}"'
+        assert full.headers["cache-control"] == settings.RESUME_DOWNLOAD_CACHE_CONTROL
+
+        cached = client.get(url, headers={**headers, "If-None-Match": f"W/{etag}"})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        since = client.get(
+            url, headers={**headers, "If-Modified-Since": full.headers["last-modified"]}
+        )
+        assert since.status_code == 304
+
+        single = client.get(url, headers={**headers, "Range": "bytes=0-9"})
+        assert single.status_code == 206
+        assert single.content == pdf_content[:10]
+        assert single.headers["content-range"] == f"bytes 0-9/{len(pdf_content)}"
+
+        multi = client.get(url, headers={**headers, "Range": "bytes=-5, 0-3, 2-7"})
+        assert multi.status_code == 206
+        content_type = multi.headers["content-type"]
+        assert content_type.startswith("multipart/byteranges; boundary=")
+        boundary = content_type.split("boundary=")[1].encode()
+        assert int(multi.headers["content-length"]) == len(multi.content)
+        parts = multi.content.split(b"--" + boundary)[1:-1]
+        bodies = [part.split(b"\r\n\r\n", 1)[1].removesuffix(b"\r\n") for part in parts]
+        assert bodies == [pdf_content[:8], pdf_content[-5:]]
+        assert multi.content.endswith(b"--" + boundary + b"--\r\n")
+
+        stale = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"old"'})
+        assert stale.status_code == 200
+        assert stale.content == pdf_content
+
+        outside = client.get(url, headers={**headers, "Range": f"bytes={len(pdf_content)}-"})
+        assert outside.status_code == 416
+        assert outside.headers["content-range"] == f"bytes */{len(pdf_content)}"
+
+    def test_conditional_download_still_authorized(self, client, test_db):
+        """A matching ETag does not bypass the ownership check"""
+        headers = candidate_headers(client, test_db)
+        files = {"resume": ("cv.pdf", io.BytesIO(b"%PDF-1.4 private"), "application/pdf")}
+        resume_id = client.post("/resumes/upload", files=files, headers=headers).json()["resume"]["id"]
+        other = UserFactory.create(
+            username="otheruser", email="other@example.com", password="otherpass123"
+        )
+        test_db.add(other)
+        test_db.commit()
+        token = client.post(
+            "/users/login", json={"username": "otheruser", "password": "otherpass123"}
+        ).json()["access_token"]
+
+        response = client.get(
+            f"/resumes/download/{resume_id}",
+            headers={"Authorization": f"Bearer {token}", "If-None-Match": "*"},
+        )
+
+        assert response.status_code == 403
+
+    def test_download_offloaded_to_proxy(self, client, test_db, monkeypatch):
+        """In offload mode the route only authorizes and names the file for the proxy"""
+        headers = candidate_headers(client, test_db)
+        pdf_content = b"%PDF-1.4 offloaded"
+        files = {"resume": ("my cv.pdf", io.BytesIO(pdf_content), "application/pdf")}
+        resume_id = client.post("/resumes/upload", files=files, headers=headers).json()["resume"]["id"]
+        sha256 = hashlib.sha256(pdf_content).hexdigest()
+
+        monkeypatch.setattr(settings, "DOWNLOAD_OFFLOAD", "x-accel-redirect")
+        response = client.get(f"/resumes/download/{resume_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == (
+            f"{settings.DOWNLOAD_OFFLOAD_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}"
+        )
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["content-disposition"] == "attachment; filename*=utf-8''my%20cv.pdf"
+
+        monkeypatch.setattr(settings, "DOWNLOAD_OFFLOAD", "x-sendfile")
+        response = client.get(f"/resumes/download/{resume_id}", headers=headers)
+        assert response.headers["x-sendfile"] == str(
+            (RESUMES_DIR / sha256[:2] / sha256[2:4] / sha256).resolve()
+        )
@@ -11,6 +11,17 @@ class TestUsersAPI:
         assert response.status_code == 201
         assert response.json()["detail"] == "User registered successfully"
 
+    def test_register_password_mismatch(self, client, sample_user_data):
+        """Validator errors are returned as JSON, not a server error"""
+        sample_user_data["confirm_password"] = "different123"
+        response = client.post("/users/register", json=sample_user_data)
+
+        assert response.status_code == 422
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert data["error"] is True
+        assert "password doesn't match" in data["detail"][0]["msg"]
+
     def test_register_user_duplicate(self, client, test_db):
         """Test duplicate user registration using UserFactory"""
         # Create user first using factory
@@ -86,6 +97,40 @@ class TestUsersAPI:
         assert response.status_code == 200
         assert "access_token" in response.json()
 
+        # The rotated refresh token cannot be used twice
+        response = client.post("/users/refresh_token", json=refresh_data)
+        assert response.status_code == 401
+
+    def test_logout_all(self, client, test_db):
+        """Test logout-all revokes every token issued so far"""
+        user = UserFactory.create(
+            username="logoutalluser",
+            email="logoutall@example.com",
+            password="logoutall123",
+        )
+        test_db.add(user)
+        test_db.commit()
+
+        login_data = {"username": "logoutalluser", "password": "logoutall123"}
+        first_session = client.post("/users/login", json=login_data).json()
+        second_session = client.post("/users/login", json=login_data).json()
+
+        headers = {"Authorization": f"Bearer {first_session['access_token']}"}
+        response = client.post("/users/logout-all", headers=headers)
+        assert response.status_code == 200
+
+        other_headers = {"Authorization": f"Bearer {second_session['access_token']}"}
+        assert client.get("/resumes/my-resumes", headers=other_headers).status_code == 401
+        response = client.post(
+            "/users/refresh_token", json={"token": second_session["refresh_token"]}
+        )
+        assert response.status_code == 401
+
+        # Logging in again issues tokens that are valid
+        new_session = client.post("/users/login", json=login_data).json()
+        new_headers = {"Authorization": f"Bearer {new_session['access_token']}"}
+        assert client.get("/resumes/my-resumes", headers=new_headers).status_code == 200
+
 
 # class TestProtectedEndpoints:
 #     """Test protected endpoints"""
@@ -32,7 +32,7 @@ class TestJWTAuth:
         assert isinstance(token, str)
         assert len(token) > 0
 
-    def test_token_blacklist(self, test_db):
+    def test_token_blacklist(self, test_db, run_with_db):
         """Test token blacklist functionality using UserFactory"""
         user = UserFactory.create(id=1)
         test_db.add(user)
@@ -41,11 +41,129 @@ class TestJWTAuth:
         token = generate_access_token(user.id)
 
         # Add token to blacklist
-        add_token_to_blacklist(token, user.id, test_db)
+        run_with_db(add_token_to_blacklist, token, user.id)
 
         # Check if token is in blacklist
-        from app.auth.token_blacklist import BlacklistedToken
+        from app.auth.token_blacklist import BlacklistedToken, token_digest
 
-        blacklisted = test_db.query(BlacklistedToken).filter_by(token=token).first()
+        blacklisted = (
+            test_db.query(BlacklistedToken)
+            .filter_by(token_digest=token_digest(token))
+            .first()
+        )
         assert blacklisted is not None
         assert blacklisted.user_id == user.id
+
+    def test_revoked_token_served_from_cache(self, test_db, run_with_db):
+        """Blacklisted tokens are rejected without another blacklist lookup"""
+        from app.auth.token_blacklist import BlacklistedToken, token_digest
+        from app.auth.token_cache import revoked_tokens, cache_hits, cache_misses
+
+        user = UserFactory.create(id=1)
+        test_db.add(user)
+        test_db.commit()
+
+        token = generate_access_token(user.id)
+        assert run_with_db(revoked_tokens.is_revoked, token_digest(token)) is False
+
+        run_with_db(add_token_to_blacklist, token, user.id)
+
+        # Drop the row: a revocation made by this process must not need the table
+        test_db.query(BlacklistedToken).delete()
+        test_db.commit()
+
+        hits_before = cache_hits.value()
+        assert run_with_db(revoked_tokens.is_revoked, token_digest(token)) is True
+        assert cache_hits.value() == hits_before + 1
+
+        misses_before = cache_misses.value()
+        other_token = generate_refresh_token(user.id)
+        assert (
+            run_with_db(revoked_tokens.is_revoked, token_digest(other_token)) is False
+        )
+        assert cache_misses.value() == misses_before + 1
+
+    def test_revoked_token_cache_picks_up_other_workers(self, test_db, run_with_db):
+        """Rows written by another process are loaded on the next refresh"""
+        from app.auth.token_blacklist import BlacklistedToken, token_digest
+        from app.auth.token_cache import revoked_tokens
+
+        user = UserFactory.create(id=1)
+        test_db.add(user)
+        test_db.commit()
+
+        token = generate_access_token(user.id)
+        test_db.add(
+            BlacklistedToken(
+                token_digest=token_digest(token),
+                user_id=user.id,
+                expires_at=datetime.now() + timedelta(minutes=15),
+            )
+        )
+        test_db.commit()
+
+        assert run_with_db(revoked_tokens.is_revoked, token_digest(token)) is True
+
+    def test_revoked_token_cache_picks_up_late_commits(self, test_db, run_with_db):
+        """A revocation committed after one with a higher id is still loaded"""
+        from app.auth.token_blacklist import BlacklistedToken, token_digest
+        from app.auth.token_cache import revoked_tokens
+
+        user = UserFactory.create(id=1)
+        test_db.add(user)
+        test_db.commit()
+
+        first, second = generate_access_token(user.id), generate_access_token(user.id)
+        expires_at = datetime.now() + timedelta(minutes=15)
+        # the logout holding id 2 commits before the one holding id 1
+        for row_id, token in ((2, second), (1, first)):
+            test_db.add(
+                BlacklistedToken(
+                    id=row_id,
+                    token_digest=token_digest(token),
+                    user_id=user.id,
+                    expires_at=expires_at,
+                )
+            )
+            test_db.commit()
+            revoked_tokens._next_refresh = 0.0
+            assert run_with_db(revoked_tokens.is_revoked, token_digest(token)) is True
+
+        assert run_with_db(revoked_tokens.is_revoked, token_digest(second)) is True
+
+    def test_tokens_carry_unique_jti(self):
+        """Tokens issued in the same instant still get distinct blacklist keys"""
+        from app.auth.token_blacklist import token_digest, TOKEN_DIGEST_SIZE
+
+        first = generate_access_token(1)
+        second = generate_access_token(1)
+
+        assert token_digest(first) != token_digest(second)
+        assert len(token_digest(first)) == TOKEN_DIGEST_SIZE
+
+    def test_purge_expired_tokens_in_batches(self, test_db):
+        """The purge worker removes only expired rows, in bounded batches"""
+        from app.auth.token_blacklist import BlacklistedToken
+        from app.auth.token_purge import purge_expired_tokens
+
+        now = datetime.utcnow()
+        for n in range(5):
+            test_db.add(
+                BlacklistedToken(
+                    token_digest=n.to_bytes(16, "big"),
+                    user_id=1,
+                    expires_at=now - timedelta(minutes=1),
+                )
+            )
+        test_db.add(
+            BlacklistedToken(
+                token_digest=(99).to_bytes(16, "big"),
+                user_id=1,
+                expires_at=now + timedelta(minutes=15),
+            )
+        )
+        test_db.commit()
+
+        assert purge_expired_tokens(test_db, batch_size=2) == 5
+        remaining = test_db.query(BlacklistedToken).all()
+        assert [row.token_digest for row in remaining] == [(99).to_bytes(16, "big")]
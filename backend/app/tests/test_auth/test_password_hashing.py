@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.auth.password_hashing import PasswordHasher
+
+
+class TestPasswordHasher:
+    """Test the bounded password hashing pool"""
+
+    def test_hash_and_verify_on_pool(self):
+        """Hashes made on the pool verify like inline ones"""
+        hasher = PasswordHasher(workers=2, max_pending=4)
+
+        async def scenario():
+            hashed = await hasher.hash("secret123")
+            return (
+                await hasher.verify("secret123", hashed),
+                await hasher.verify("wrong", hashed),
+            )
+
+        try:
+            assert asyncio.run(scenario()) == (True, False)
+        finally:
+            hasher.shutdown()
+
+    def test_process_pool_does_not_fork_the_app(self):
+        """Pool workers come from the fork server, not a fork of the threaded app"""
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        try:
+            assert hasher._get_executor()._mp_context.get_start_method() == "forkserver"
+        finally:
+            hasher.shutdown()
+
+    def test_saturated_pool_returns_503(self):
+        """Calls beyond the queue-depth limit are rejected instead of queued"""
+        hasher = PasswordHasher(workers=1, max_pending=1)
+
+        async def scenario():
+            first = asyncio.ensure_future(hasher.hash("secret123"))
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.hash("another")
+            await first
+            return exc_info.value
+
+        try:
+            error = asyncio.run(scenario())
+        finally:
+            hasher.shutdown()
+
+        assert error.status_code == 503
+        assert error.headers["Retry-After"] == "1"
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db_pool import (
+    pool_checked_out,
+    pool_checkout_seconds,
+    pool_checkout_timeouts,
+    pool_options,
+    register_pool_metrics,
+)
+
+
+@pytest.fixture
+def pool_engine(monkeypatch, tmp_path):
+    """File-backed sqlite engine with a one-connection pool and no overflow"""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **pool_options(url, "test"))
+    unregister = register_pool_metrics(engine, "test")
+    yield engine
+    unregister()
+    engine.dispose()
+
+
+class TestDbPool:
+    """Test pool settings and pool metrics"""
+
+    def test_checked_out_gauge_and_wait_histogram(self, pool_engine):
+        """Scrapes report live checkouts and every checkout is timed"""
+        observed = pool_checkout_seconds.count(pool="test")
+
+        with pool_engine.connect():
+            text = metrics.REGISTRY.render()
+            assert 'db_pool_checked_out{pool="test"} 1' in text
+            assert 'db_pool_size{pool="test"} 1' in text
+
+        metrics.REGISTRY.render()
+        assert pool_checked_out.value(pool="test") == 0
+        assert pool_checkout_seconds.count(pool="test") == observed + 1
+
+    def test_exhaustion_counts_timeouts(self, pool_engine):
+        """A checkout on an exhausted pool times out and is counted"""
+        timeouts = pool_checkout_timeouts.value(pool="test")
+
+        with pool_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                pool_engine.connect()
+
+        assert pool_checkout_timeouts.value(pool="test") == timeouts + 1
+
+    def test_unregister_drops_pool_series(self, monkeypatch, tmp_path):
+        """A disposed engine's pool no longer shows up in scrapes"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+        url = f"sqlite:///{tmp_path / 'gone.db'}"
+        engine = create_engine(url, **pool_options(url, "gone"))
+        unregister = register_pool_metrics(engine, "gone")
+        assert 'db_pool_size{pool="gone"} 1' in metrics.REGISTRY.render()
+
+        unregister()
+        engine.dispose()
+
+        assert 'pool="gone"' not in metrics.REGISTRY.render()
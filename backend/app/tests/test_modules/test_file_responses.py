@@ -0,0 +1,27 @@
+from app.core.file_responses import MAX_RANGES, parse_byte_ranges
+
+
+class TestFileResponses:
+    """Test Range header parsing"""
+
+    def test_parse_byte_ranges(self):
+        """Ranges are clamped, sorted and coalesced"""
+        assert parse_byte_ranges("bytes=0-99", 1000) == [(0, 100)]
+        assert parse_byte_ranges("bytes=900-", 1000) == [(900, 1000)]
+        assert parse_byte_ranges("bytes=-100", 1000) == [(900, 1000)]
+        assert parse_byte_ranges("bytes=-5000", 1000) == [(0, 1000)]
+        assert parse_byte_ranges("bytes=990-2000", 1000) == [(990, 1000)]
+        assert parse_byte_ranges("bytes=500-599, 0-9, 5-19, 20-29", 1000) == [
+            (0, 30), (500, 600),
+        ]
+
+    def test_unsatisfiable_and_invalid_ranges(self):
+        """Unsatisfiable ranges give [], invalid headers are ignored (None)"""
+        assert parse_byte_ranges("bytes=1000-", 1000) == []
+        assert parse_byte_ranges("bytes=-0", 1000) == []
+        assert parse_byte_ranges("bytes=5-1", 1000) is None
+        assert parse_byte_ranges("bytes=a-b", 1000) is None
+        assert parse_byte_ranges("items=0-1", 1000) is None
+        assert parse_byte_ranges("bytes=-", 1000) is None
+        many = ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(MAX_RANGES + 1))
+        assert parse_byte_ranges(f"bytes={many}", 1000) is None
@@ -0,0 +1,85 @@
+import json
+import logging
+import sys
+import time
+
+from app.core.json_logging import (
+    JsonFormatter,
+    RateLimitFilter,
+    RequestContextFilter,
+    _NonBlockingQueueHandler,
+)
+from app.core.request_context import RequestInfo, current_request
+
+
+def make_record(msg="Something failed", level=logging.ERROR, **extra):
+    return logging.makeLogRecord(
+        {
+            "name": "app.test",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": msg,
+            **extra,
+        }
+    )
+
+
+class TestJsonLogging:
+    """Test the structured logging pipeline pieces"""
+
+    def test_json_record_carries_request_context(self):
+        """Records are ECS-shaped JSON with request id, route and user id"""
+        info = RequestInfo("req-1", {"method": "GET", "path": "/resumes/my-resumes"})
+        info.user_id = 7
+        token = current_request.set(info)
+        try:
+            record = make_record("Lookup took %d ms", args=(12,), status=500)
+            RequestContextFilter().filter(record)
+        finally:
+            current_request.reset(token)
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record.exc_info = sys.exc_info()
+        prepared = _NonBlockingQueueHandler(None).prepare(record)
+        payload = json.loads(JsonFormatter().format(prepared))
+
+        assert payload["message"] == "Lookup took 12 ms"
+        assert payload["log.level"] == "error"
+        assert payload["request_id"] == "req-1"
+        assert payload["user_id"] == 7
+        assert payload["status"] == 500
+        assert payload["@timestamp"].endswith("Z")
+        assert "ValueError: boom" in payload["error.stack_trace"]
+
+    def test_rate_limit_repeated_records(self):
+        """Identical records past the limit are dropped and counted"""
+        limiter = RateLimitFilter(limit=2, window=0.05)
+
+        passed = [limiter.filter(make_record()) for _ in range(5)]
+        assert passed == [True, True, False, False, False]
+        assert limiter.filter(make_record("Other failure"))
+
+        time.sleep(0.06)
+        record = make_record()
+        assert limiter.filter(record)
+        assert record.suppressed == 3
+
+    def test_rate_limit_exempt_logger(self):
+        """Access records are never rate limited"""
+        limiter = RateLimitFilter(limit=1, window=60, exempt=("app.access",))
+        records = [make_record(name="app.access") for _ in range(3)]
+
+        assert all(limiter.filter(r) for r in records)
+
+    def test_access_record_and_request_id(self, client, caplog):
+        """Every request gets one access record and echoes X-Request-ID"""
+        with caplog.at_level(logging.INFO, logger="app.access"):
+            response = client.get("/", headers={"X-Request-ID": "from-proxy"})
+
+        assert response.headers["X-Request-ID"] == "from-proxy"
+        access = [r for r in caplog.records if r.name == "app.access"]
+        assert len(access) == 1
+        assert access[0].status == 200
+        assert access[0].duration_ms > 0
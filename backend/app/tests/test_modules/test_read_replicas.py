@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import database
+from app.core.database import Base, get_read_db
+from app.core.replicas import ReplicaSet
+from app.main import app
+from app.tests.conftest import async_engine as primary_engine
+from app.tests.factories.user_factory import UserFactory
+from app.users.models import UserRole, UsersModel
+
+
+@pytest.fixture
+def replica_engines():
+    """Async engines created by a test, disposed when it ends"""
+    engines = []
+    yield engines
+
+    async def dispose():
+        for engine in engines:
+            await engine.dispose()
+
+    asyncio.run(dispose())
+
+
+@pytest.fixture
+def sqlite_replica(tmp_path, replica_engines):
+    """Factory of async engines on fresh sqlite files, optionally seeded with users"""
+
+    def make(seed_usernames=()):
+        path = tmp_path / f"replica{len(replica_engines)}.db"
+        seed = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=seed)
+        with seed.begin() as conn:
+            for name in seed_usernames:
+                conn.execute(
+                    UsersModel.__table__.insert().values(
+                        username=name, email=f"{name}@example.com", password="x",
+                        role=UserRole.CANDIDATE, is_active=True,
+                    )
+                )
+        seed.dispose()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        replica_engines.append(engine)
+        return engine
+
+    return make
+
+
+@pytest.fixture
+def unreachable_replica(tmp_path, replica_engines):
+    """Factory of async engines on a sqlite file in a missing directory"""
+
+    def make():
+        path = tmp_path / "missing" / "replica.db"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        replica_engines.append(engine)
+        return engine
+
+    return make
+
+
+@asynccontextmanager
+async def connection_threads_settled():
+    """
+    Wait for aiosqlite threads started inside the block to finish while the
+    loop still runs: after a failed connect they report back to it, and
+    would raise "Event loop is closed" once asyncio.run has returned.
+    """
+    before = set(threading.enumerate())
+    try:
+        yield
+    finally:
+        started = [t for t in threading.enumerate() if t not in before]
+        while any(t.is_alive() for t in started):
+            await asyncio.sleep(0.01)
+
+
+def replica_set(replicas, max_lag=10.0):
+    return ReplicaSet(
+        primary_engine, replicas, max_lag=max_lag, check_interval=60.0, check_timeout=1.0
+    )
+
+
+class TestReadReplicas:
+    """Test replica selection and the read-only session dependency"""
+
+    def test_round_robin(self, sqlite_replica):
+        """Healthy replicas take turns"""
+        replicas = replica_set([sqlite_replica(), sqlite_replica()])
+
+        async def picks():
+            return [(await replicas.pick()).name for _ in range(4)]
+
+        assert asyncio.run(picks()) == ["replica0", "replica1", "replica0", "replica1"]
+
+    def test_unreachable_replica_is_skipped(self, sqlite_replica, unreachable_replica):
+        """Sessions fall back to the primary when no replica is usable"""
+        replicas = replica_set([unreachable_replica(), sqlite_replica()])
+
+        async def picks():
+            async with connection_threads_settled():
+                return [(await replicas.pick()).name for _ in range(3)]
+
+        assert asyncio.run(picks()) == ["replica1", "replica1", "replica1"]
+
+        replicas = replica_set([unreachable_replica()])
+
+        async def session_engine():
+            async with connection_threads_settled():
+                async with await replicas.session() as db:
+                    return db.bind
+
+        assert asyncio.run(session_engine()) is primary_engine
+
+    def test_lagging_replica_is_skipped(self, monkeypatch, sqlite_replica):
+        """A replica past the lag limit is treated as unhealthy"""
+        replicas = replica_set([sqlite_replica()], max_lag=5.0)
+
+        async def lag(engine):
+            return 30.0
+
+        monkeypatch.setattr(replicas, "_lag", lag)
+        assert asyncio.run(replicas.pick()) is None
+
+    def test_read_endpoint_served_by_replica(
+        self, client, test_db, monkeypatch, sqlite_replica
+    ):
+        """GET /admin/users reads from the replica, writes stay on the primary"""
+        admin = UserFactory.create_admin(
+            username="replicaadmin", email="replicaadmin@example.com", password="adminpass123"
+        )
+        test_db.add(admin)
+        test_db.commit()
+
+        monkeypatch.setattr(
+            database, "read_replicas", replica_set([sqlite_replica(["onreplica"])])
+        )
+        app.dependency_overrides.pop(get_read_db)
+
+        login_data = {"username": "replicaadmin", "password": "adminpass123"}
+        access_token = client.post("/users/login", json=login_data).json()["access_token"]
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        response = client.get("/admin/users", headers=headers)
+
+        assert response.status_code == 200
+        assert [u["username"] for u in response.json()] == ["onreplica"]
@@ -0,0 +1,54 @@
+import hashlib
+
+from app.core.storage import LocalStorage
+from app.CV.blobs import blob_key
+from app.CV.dedupe import dedupe_resumes
+from app.CV.models import Resume, ResumeBlob
+from app.tests.factories.user_factory import UserFactory
+
+
+def legacy_resume(directory, name, content):
+    path = directory / name
+    if content is not None:
+        path.write_bytes(content)
+    return Resume(
+        file_path=str(path),
+        file_name=name,
+        file_size=len(content or b""),
+        mime_type="application/pdf",
+    )
+
+
+class TestResumeDedupe:
+    """Test moving pre-existing resume files into the blob store"""
+
+    def test_dedupe_existing_files(self, test_db, tmp_path):
+        """Identical files collapse into one blob, missing files are left alone"""
+        same, other = b"%PDF-1.4 same", b"%PDF-1.4 other"
+        user = UserFactory.create()
+        user.resumes = [
+            legacy_resume(tmp_path, "1_a.pdf", same),
+            legacy_resume(tmp_path, "1_b.pdf", same),
+            legacy_resume(tmp_path, "1_c.pdf", other),
+            legacy_resume(tmp_path, "1_d.pdf", None),
+        ]
+        test_db.add(user)
+        test_db.commit()
+
+        stats = dedupe_resumes(test_db, LocalStorage(tmp_path), workers=2, batch_size=3)
+
+        assert (stats.resumes, stats.blobs_created, stats.duplicates, stats.missing) == (
+            4, 2, 1, 1,
+        )
+        assert stats.bytes_freed == len(same)
+        same_hash = hashlib.sha256(same).hexdigest()
+        assert test_db.get(ResumeBlob, same_hash).ref_count == 2
+        assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == sorted(
+            [same_hash, hashlib.sha256(other).hexdigest()]
+        )
+        paths = {r.file_name: r.file_path for r in test_db.query(Resume)}
+        assert paths["1_a.pdf"] == paths["1_b.pdf"] == str(tmp_path / blob_key(same_hash))
+        assert paths["1_d.pdf"] == str(tmp_path / "1_d.pdf")
+
+        # a second run only revisits the missing file
+        assert dedupe_resumes(test_db, LocalStorage(tmp_path)).resumes == 1
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.CV import jobs
+from app.CV.jobs import claim_jobs, finish_job
+from app.CV.models import Resume, ResumeJob
+from app.CV.worker import job_pool, run_worker
+from app.tests.factories.user_factory import UserFactory
+
+VALID_PDF = b"%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n"
+
+
+def queued_resume(test_db, path, content, kinds=("validate_pdf",)):
+    """A resume stored at `path` with one queued job per kind"""
+    path.write_bytes(content)
+    user = UserFactory.create()
+    user.resumes = [
+        Resume(
+            file_path=str(path),
+            file_name="cv.pdf",
+            file_size=len(content),
+            mime_type="application/pdf",
+            processing_status="pending",
+            jobs=[ResumeJob(kind=kind) for kind in kinds],
+        )
+    ]
+    test_db.add(user)
+    test_db.commit()
+    return user.resumes[0].id
+
+
+def drain(test_db, **options):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        return run_worker(test_db, pool, 2, poll_seconds=0.01, drain=True, **options)
+
+
+def job_states(test_db, resume_id):
+    test_db.expire_all()
+    resume = test_db.get(Resume, resume_id)
+    query = test_db.query(ResumeJob).filter_by(resume_id=resume_id).order_by(ResumeJob.id)
+    states = [(job.status, job.attempts) for job in query]
+    return resume.processing_status, states
+
+
+class TestResumeJobs:
+    """Test the post-upload job queue and worker"""
+
+    def test_valid_and_invalid_files(self, test_db, tmp_path):
+        """A valid PDF becomes ready, a truncated one fails without retries"""
+        valid = queued_resume(test_db, tmp_path / "valid.pdf", VALID_PDF)
+        truncated = queued_resume(test_db, tmp_path / "truncated.pdf", VALID_PDF[:20])
+
+        stats = drain(test_db)
+
+        assert (stats.done, stats.failed, stats.retried) == (1, 1, 0)
+        assert job_states(test_db, valid) == ("ready", [("done", 1)])
+        assert job_states(test_db, truncated) == ("failed", [("failed", 1)])
+        job = test_db.query(ResumeJob).filter_by(resume_id=truncated).one()
+        assert job.last_error == "PermanentJobError: PDF file is truncated"
+
+    def test_job_pool_does_not_fork_the_worker(self, tmp_path):
+        """Job processes come from the fork server and run the handlers"""
+        path = tmp_path / "cv.pdf"
+        path.write_bytes(VALID_PDF)
+
+        with job_pool(1) as pool:
+            assert pool._mp_context.get_start_method() == "forkserver"
+            assert pool.submit(jobs.run_job, "validate_pdf", str(path)).result() is None
+
+    def test_transient_errors_are_retried(self, test_db, tmp_path, monkeypatch):
+        """Other errors are retried until the attempts are used up"""
+        def flaky(path):
+            raise OSError("store unavailable")
+
+        monkeypatch.setitem(jobs.JOB_HANDLERS, "flaky", flaky)
+        resume_id = queued_resume(
+            test_db, tmp_path / "cv.pdf", VALID_PDF, ("validate_pdf", "flaky")
+        )
+
+        stats = drain(test_db, max_attempts=3, retry_seconds=0)
+
+        assert (stats.retried, stats.failed) == (2, 1)
+        assert job_states(test_db, resume_id) == ("failed", [("done", 1), ("failed", 3)])
+
+    def test_expired_lease(self, test_db, tmp_path):
+        """A job past its visibility timeout goes to the next worker, the first loses it"""
+        resume_id = queued_resume(test_db, tmp_path / "cv.pdf", VALID_PDF)
+
+        (first,) = claim_jobs(test_db, 10, visibility_timeout=0, max_attempts=2)
+        (second,) = claim_jobs(test_db, 10, visibility_timeout=0, max_attempts=2)
+        assert claim_jobs(test_db, 10, visibility_timeout=0, max_attempts=2) == []
+
+        assert finish_job(test_db, first, None, max_attempts=2, retry_seconds=0) is None
+        assert second.attempts == 2
+        assert job_states(test_db, resume_id) == ("failed", [("failed", 2)])
+        assert finish_job(test_db, second, None, max_attempts=2, retry_seconds=0) is None
+
+    def test_pending_until_all_jobs_done(self, test_db, tmp_path):
+        """The resume stays pending while any of its jobs is unfinished"""
+        resume_id = queued_resume(test_db, tmp_path / "cv.pdf", VALID_PDF, ("validate_pdf",) * 2)
+
+        first, second = claim_jobs(test_db, 10, visibility_timeout=60, max_attempts=2)
+        assert finish_job(test_db, first, None, max_attempts=2, retry_seconds=0) == "done"
+        assert job_states(test_db, resume_id)[0] == "pending"
+        assert finish_job(test_db, second, None, max_attempts=2, retry_seconds=0) == "done"
+        assert job_states(test_db, resume_id)[0] == "ready"
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.core.storage import LocalStorage
+from app.CV.blobs import blob_key, flat_blob_key
+from app.CV.models import Resume, ResumeBlob
+from app.CV.reconcile import RateLimiter, _in_order, reconcile
+from app.tests.factories.user_factory import UserFactory
+
+
+def stored_blob(test_db, storage, content, key=blob_key, store=True):
+    """A blob with one resume, its object stored under `key` unless store is False"""
+    sha256 = hashlib.sha256(content).hexdigest()
+    if store:
+        path = storage.path(key(sha256))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    test_db.add(ResumeBlob(sha256=sha256, size=len(content), ref_count=1))
+    user = UserFactory.create()
+    user.resumes = [
+        Resume(
+            file_path=storage.location(key(sha256)),
+            file_name="cv.pdf",
+            file_size=len(content),
+            mime_type="application/pdf",
+            content_hash=sha256,
+        )
+    ]
+    test_db.add(user)
+    test_db.commit()
+    return sha256
+
+
+def orphan(storage, content):
+    """An object with no resume or blob row"""
+    key = blob_key(hashlib.sha256(content).hexdigest())
+    storage.path(key).parent.mkdir(parents=True, exist_ok=True)
+    storage.path(key).write_bytes(content)
+    return key
+
+
+class TestReconcile:
+    """Test reconciling stored resume files with the resumes table"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return LocalStorage(tmp_path / "resumes")
+
+    def test_report_only(self, test_db, storage):
+        """Orphans and dangling rows are counted but left alone"""
+        stored_blob(test_db, storage, b"%PDF-1.4 kept")
+        missing = stored_blob(test_db, storage, b"%PDF-1.4 lost", store=False)
+        key = orphan(storage, b"%PDF-1.4 orphan")
+        (storage.directory / ".upload-1.part").write_bytes(b"partial")
+
+        stats = reconcile(test_db, storage, batch_size=1, grace_seconds=0)
+
+        assert (stats.objects, stats.resumes, stats.orphans, stats.dangling) == (2, 2, 1, 1)
+        assert (stats.removed_objects, stats.removed_resumes) == (0, 0)
+        assert storage.exists(key)
+        assert test_db.query(Resume).filter(Resume.content_hash == missing).count() == 1
+
+    def test_repair(self, test_db, storage):
+        """Orphans are deleted, dangling rows go with their blob reference"""
+        kept = stored_blob(test_db, storage, b"%PDF-1.4 kept")
+        missing = stored_blob(test_db, storage, b"%PDF-1.4 lost", store=False)
+        key = orphan(storage, b"%PDF-1.4 orphan")
+
+        stats = reconcile(test_db, storage, repair=True, batch_size=1, grace_seconds=0)
+
+        assert (stats.removed_objects, stats.removed_resumes) == (1, 1)
+        assert not storage.exists(key)
+        assert storage.exists(blob_key(kept))
+        assert [r.content_hash for r in test_db.query(Resume)] == [kept]
+        assert test_db.get(ResumeBlob, missing) is None
+        assert reconcile(test_db, storage, grace_seconds=0).orphans == 0
+
+    def test_recent_and_claimed_files_are_kept(self, test_db, storage):
+        """Files inside the grace period or still backing a blob are not removed"""
+        recent = orphan(storage, b"%PDF-1.4 uploading")
+        sha256 = stored_blob(test_db, storage, b"%PDF-1.4 moving", key=flat_blob_key)
+        storage.path(blob_key(sha256)).parent.mkdir(parents=True)
+        storage.path(blob_key(sha256)).write_bytes(b"%PDF-1.4 moving")
+
+        stats = reconcile(test_db, storage, repair=True, grace_seconds=3600)
+        assert (stats.recent, stats.orphans) == (2, 0)
+
+        stats = reconcile(test_db, storage, repair=True, grace_seconds=0)
+        assert (stats.orphans, stats.removed_objects) == (2, 1)
+        assert not storage.exists(recent)
+        assert storage.exists(blob_key(sha256)) and storage.exists(flat_blob_key(sha256))
+
+    def test_unreferenced_blob_is_purged(self, test_db, storage):
+        """A blob left at zero references by an interrupted purge goes with its file"""
+        sha256 = stored_blob(test_db, storage, b"%PDF-1.4 released")
+        test_db.query(Resume).delete()
+        test_db.get(ResumeBlob, sha256).ref_count = 0
+        test_db.commit()
+
+        stats = reconcile(test_db, storage, repair=True, grace_seconds=0)
+
+        assert (stats.orphans, stats.removed_objects) == (1, 1)
+        assert not storage.exists(blob_key(sha256))
+        assert test_db.get(ResumeBlob, sha256) is None
+
+    def test_stale_staged_uploads_are_swept(self, test_db, storage):
+        """Staging files older than the grace period are reported, then removed"""
+        stale = storage.directory / ".upload-stale.part"
+        fresh = storage.directory / ".upload-fresh.part"
+        checkpoint = storage.directory / ".layout-checkpoint"
+        for path in (stale, fresh, checkpoint):
+            path.write_bytes(b"partial")
+        an_hour_ago = time.time() - 3600
+        os.utime(stale, (an_hour_ago, an_hour_ago))
+        os.utime(checkpoint, (an_hour_ago, an_hour_ago))
+
+        stats = reconcile(test_db, storage, grace_seconds=60, staging=storage.directory)
+        assert (stats.stale_uploads, stats.removed_uploads, stats.objects) == (1, 0, 0)
+        assert stale.exists()
+
+        stats = reconcile(
+            test_db, storage, repair=True, grace_seconds=60, staging=storage.directory
+        )
+        assert (stats.stale_uploads, stats.removed_uploads) == (1, 1)
+        assert not stale.exists()
+        assert fresh.exists() and checkpoint.exists()
+
+    def test_unsorted_input_is_refused(self):
+        """A stream out of key order stops the run instead of reporting live data"""
+        with pytest.raises(RuntimeError):
+            list(_in_order([("b", 0.0), ("a", 0.0)], "store"))
+
+    def test_rate_limiter(self):
+        """Waits keep callers at the configured rate"""
+        now = [0.0]
+        limiter = RateLimiter(
+            100, clock=lambda: now[0], sleep=lambda seconds: now.__setitem__(0, now[0] + seconds)
+        )
+
+        for _ in range(50):
+            limiter.wait()
+
+        # 50 items at 100/s, never more than one 50 ms slice ahead
+        assert 0.45 <= now[0] <= 0.5
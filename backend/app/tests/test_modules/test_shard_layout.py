@@ -0,0 +1,71 @@
+import hashlib
+
+from app.core.storage import LocalStorage
+from app.CV.blobs import blob_key
+from app.CV.models import Resume, ResumeBlob
+from app.CV.shard_layout import migrate_layout
+from app.tests.factories.user_factory import UserFactory
+
+
+def flat_blob(test_db, directory, content, references=1):
+    """A blob stored under the flat layout with `references` resumes"""
+    sha256 = hashlib.sha256(content).hexdigest()
+    (directory / sha256).write_bytes(content)
+    test_db.add(ResumeBlob(sha256=sha256, size=len(content), ref_count=references))
+    user = UserFactory.create()
+    user.resumes = [
+        Resume(
+            file_path=str(directory / sha256),
+            file_name="cv.pdf",
+            file_size=len(content),
+            mime_type="application/pdf",
+            content_hash=sha256,
+        )
+        for _ in range(references)
+    ]
+    test_db.add(user)
+    test_db.commit()
+    return sha256
+
+
+class TestShardLayout:
+    """Test moving flat blobs into the fan-out layout"""
+
+    def test_migrate_layout(self, test_db, tmp_path):
+        """Files move under ab/cd/, rows follow and reruns are no-ops"""
+        storage = LocalStorage(tmp_path / "resumes")
+        hashes = [
+            flat_blob(test_db, storage.directory, b"%PDF-1.4 one", references=2),
+            flat_blob(test_db, storage.directory, b"%PDF-1.4 two"),
+        ]
+        checkpoint = tmp_path / "checkpoint"
+
+        stats = migrate_layout(test_db, storage, workers=2, batch_size=1, checkpoint=checkpoint)
+
+        assert (stats.blobs, stats.moved, stats.resumes, stats.missing) == (2, 2, 3, 0)
+        for sha256 in hashes:
+            assert storage.exists(blob_key(sha256))
+            assert not (storage.directory / sha256).exists()
+        assert {r.file_path for r in test_db.query(Resume)} == {
+            storage.location(blob_key(sha256)) for sha256 in hashes
+        }
+        assert checkpoint.read_text() == max(hashes)
+
+        assert migrate_layout(test_db, storage, checkpoint=checkpoint).blobs == 0
+        assert migrate_layout(test_db, storage).moved == 0
+
+    def test_resume_after_checkpoint(self, test_db, tmp_path):
+        """Blobs up to the checkpoint are skipped on the next run"""
+        storage = LocalStorage(tmp_path / "resumes")
+        first, second = sorted(
+            flat_blob(test_db, storage.directory, content)
+            for content in (b"%PDF-1.4 a", b"%PDF-1.4 b")
+        )
+        checkpoint = tmp_path / "checkpoint"
+        checkpoint.write_text(first)
+
+        stats = migrate_layout(test_db, storage, checkpoint=checkpoint)
+
+        assert stats.blobs == 1
+        assert storage.exists(blob_key(second))
+        assert (storage.directory / first).exists()
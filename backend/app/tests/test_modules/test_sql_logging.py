@@ -0,0 +1,78 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.request_context import QueryStats, current_query_stats, current_route
+from app.core.sql_logging import (
+    install_sql_logging,
+    log_repeated_statements,
+    normalize_sql,
+)
+
+
+class TestSqlLogging:
+    """Test the slow-query log and statement normalization"""
+
+    def test_normalize_sql(self):
+        """Literals and IN lists are folded, whitespace collapsed"""
+        sql = normalize_sql(
+            "SELECT *\n  FROM users\n WHERE name = 'o''brien' AND id IN (?, ?, ?) LIMIT 10"
+        )
+        assert sql == "SELECT * FROM users WHERE name = ? AND id IN (...) LIMIT ?"
+
+    def test_slow_query_logged_with_route(self, caplog, monkeypatch):
+        """Statements over the threshold are logged with duration and route"""
+        engine = create_engine("sqlite://")
+        install_sql_logging(engine)
+        monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 1e-6)
+
+        token = current_route.set("GET /resumes/my-resumes")
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.sql"):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 42"))
+        finally:
+            current_route.reset(token)
+
+        record = next(r for r in caplog.records if r.name == "app.sql")
+        assert record.levelno == logging.WARNING
+        assert record.route == "GET /resumes/my-resumes"
+        assert record.sql == "SELECT ?"
+        assert record.duration_ms > 0
+
+    def test_fast_query_not_logged(self, caplog, monkeypatch):
+        """Nothing is logged under the threshold with sampling disabled"""
+        engine = create_engine("sqlite://")
+        install_sql_logging(engine)
+        monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 60_000.0)
+        monkeypatch.setattr(settings, "SQL_LOG_SAMPLE_RATE", 0.0)
+
+        with caplog.at_level(logging.INFO, logger="app.sql"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        assert not [r for r in caplog.records if r.name == "app.sql"]
+
+    def test_repeated_statements_flagged(self, caplog):
+        """A statement issued once per row is reported as repeated"""
+        engine = create_engine("sqlite://")
+        install_sql_logging(engine)
+        stats = QueryStats(track_statements=True)
+
+        token = current_query_stats.set(stats)
+        try:
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("SELECT :id"), {"id": i})
+                conn.execute(text("SELECT 'other'"))
+        finally:
+            current_query_stats.reset(token)
+
+        assert stats.count == 4
+        assert stats.duration_ms > 0
+        assert stats.repeated(3) == [("SELECT ?", 3)]
+
+        with caplog.at_level(logging.WARNING, logger="app.sql"):
+            log_repeated_statements(stats, 3)
+        assert [r.repeat_count for r in caplog.records if r.name == "app.sql"] == [3]
@@ -0,0 +1,105 @@
+from urllib.parse import parse_qs, urlsplit
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.storage import LocalStorage, S3Storage
+
+BUCKET = "resumes-test"
+
+
+@pytest.fixture
+def s3_storage():
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield S3Storage(
+            BUCKET, prefix="resumes/", region="us-east-1",
+            chunk_size=5 * 1024 * 1024, url_expires=60,
+        )
+
+
+class TestStorage:
+    """Test the local and S3 storage drivers"""
+
+    def test_local_store_and_delete(self, tmp_path):
+        """Stored files move into the directory unless the source is kept"""
+        storage = LocalStorage(tmp_path / "store")
+        source = tmp_path / "upload.part"
+        source.write_bytes(b"%PDF-1.4")
+
+        storage.store("a", source, keep_source=True)
+        storage.store("b", source)
+
+        assert storage.exists("a") and storage.exists("b")
+        assert not source.exists()
+        assert storage.local_path("a").read_bytes() == b"%PDF-1.4"
+        assert storage.download_url("a", "cv.pdf", "application/pdf") is None
+        storage.delete("a")
+        storage.delete("a")
+        assert not storage.exists("a")
+
+    def test_s3_multipart_store(self, s3_storage, tmp_path):
+        """Files over the chunk size go up in parts under the prefix"""
+        source = tmp_path / "upload.part"
+        content = b"%PDF-1.4" + b"x" * (11 * 1024 * 1024)
+        source.write_bytes(content)
+
+        s3_storage.store("abc", source)
+
+        assert not source.exists()
+        assert s3_storage.exists("abc")
+        head = s3_storage.client.head_object(Bucket=BUCKET, Key="resumes/abc")
+        assert head["ContentLength"] == len(content)
+        assert head["ETag"].strip('"').endswith("-3")
+        assert s3_storage.location("abc") == f"s3://{BUCKET}/resumes/abc"
+
+        s3_storage.delete("abc")
+        assert not s3_storage.exists("abc")
+
+    def test_s3_presigned_download(self, s3_storage, tmp_path):
+        """Download URLs are signed, expire and name the file for the browser"""
+        source = tmp_path / "upload.part"
+        source.write_bytes(b"%PDF-1.4")
+        s3_storage.store("abc", source)
+
+        url = s3_storage.download_url("abc", "my cv.pdf", "application/pdf")
+
+        query = parse_qs(urlsplit(url).query)
+        assert urlsplit(url).path.endswith("/resumes/abc")
+        assert "X-Amz-Signature" in query or "Signature" in query
+        assert query["response-content-type"] == ["application/pdf"]
+        assert "my%20cv.pdf" in query["response-content-disposition"][0]
+
+    def test_local_iter_objects_in_key_order(self, tmp_path):
+        """Keys come out in string order across directories, dot files skipped"""
+        storage = LocalStorage(tmp_path / "store")
+        source = tmp_path / "upload.part"
+        for key in ("ab0", "ab/cd/x", "ab-x", "b", "ab/c"):
+            source.write_bytes(b"%PDF-1.4")
+            storage.store(key, source)
+        (storage.directory / ".upload-1.part").write_bytes(b"partial")
+
+        keys = [key for key, _ in storage.iter_objects()]
+
+        assert keys == ["ab-x", "ab/c", "ab/cd/x", "ab0", "b"]
+        assert list(LocalStorage(tmp_path / "missing").iter_objects()) == []
+
+    def test_s3_iter_objects(self, s3_storage, tmp_path):
+        """Listed keys are relative to the prefix"""
+        source = tmp_path / "upload.part"
+        for key in ("b", "a/b"):
+            source.write_bytes(b"%PDF-1.4")
+            s3_storage.store(key, source)
+
+        assert [key for key, _ in s3_storage.iter_objects()] == ["a/b", "b"]
+
+    def test_s3_fetch(self, s3_storage, tmp_path):
+        """Objects are copied back into local files for processing"""
+        source = tmp_path / "upload.part"
+        source.write_bytes(b"%PDF-1.4 fetched")
+        s3_storage.store("abc", source)
+
+        s3_storage.fetch("abc", tmp_path / "copy.pdf")
+
+        assert (tmp_path / "copy.pdf").read_bytes() == b"%PDF-1.4 fetched"
@@ -8,6 +8,7 @@ from sqlalchemy import (
     func,
     DateTime,
     Enum,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -32,14 +33,27 @@ class UsersModel(Base):
     password = Column(String, nullable=False)
     email = Column(String(250), nullable=False, unique=True)
     github = Column(String, nullable=True)
-    role = Column(Enum(UserRole), default=UserRole.CANDIDATE, nullable=False)
+    role = Column(Enum(UserRole), default=UserRole.CANDIDATE, nullable=False, index=True)
     is_active = Column(Boolean, nullable=False, default=True)
     created_date = Column(DateTime, server_default=func.now(), nullable=False)
     updated_date = Column(
         DateTime, server_default=func.now(), server_onupdate=func.now(), nullable=False
     )
+    # Tokens issued before this moment (UTC) are revoked, see /users/logout-all
+    tokens_valid_after = Column(DateTime, nullable=True)
     resumes = relationship("Resume", back_populates="user")
 
+    # pg_trgm indexes for the admin ILIKE '%search%' (PostgreSQL only)
+    __table_args__ = tuple(
+        Index(
+            f"ix_users_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql")
+        for column in ("username", "email")
+    )
+
     def hash_password(self, plain_password: str) -> str:
         """Hashing password"""
         return pwd_context.hash(plain_password)
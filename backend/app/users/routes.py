@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from app.users.schemas import (
     UserRegisterSchema,
     UserLoginSchema,
     UserRefreshTokenSchema,
 )
 from app.users.models import UsersModel, UserRole
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from typing import List
 from app.auth.jwt_auth import (
@@ -15,7 +16,10 @@ from app.auth.jwt_auth import (
     decode_refresh_token,
     add_token_to_blacklist,
     get_authenticated_user,
+    revoke_all_user_tokens,
 )
+from app.auth.principal_cache import Principal
+from app.auth.password_hashing import password_hasher
 import secrets
 
 router = APIRouter(tags=["users"], prefix="/users")
@@ -27,10 +31,14 @@ def generate_token(length=32):
 
 
 @router.post("/register")
-async def user_register(request: UserRegisterSchema, db: Session = Depends(get_db)):
+async def user_register(
+    request: UserRegisterSchema, db: AsyncSession = Depends(get_db)
+):
     if (
-        db.query(UsersModel).filter_by(username=request.username.lower()).first()
-        or db.query(UsersModel).filter_by(email=request.email.lower()).first()
+        await db.scalar(
+            select(UsersModel.id).filter_by(username=request.username.lower())
+        )
+        or await db.scalar(select(UsersModel.id).filter_by(email=request.email.lower()))
     ):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -48,18 +56,20 @@ async def user_register(request: UserRegisterSchema, db: Session = Depends(get_d
         github=request.github,
         role=role,
     )
-    user_obj.set_password(request.password)
+    user_obj.password = await password_hasher.hash(request.password)
     db.add(user_obj)
-    db.commit()
-    return JSONResponse(
+    await db.commit()
+    return ORJSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={"detail": "User registered successfully"},
     )
 
 
 @router.post("/login")
-async def user_login(request: UserLoginSchema, db: Session = Depends(get_db)):
-    user_obj = db.query(UsersModel).filter_by(username=request.username.lower()).first()
+async def user_login(request: UserLoginSchema, db: AsyncSession = Depends(get_db)):
+    user_obj = await db.scalar(
+        select(UsersModel).filter_by(username=request.username.lower())
+    )
     if not user_obj:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,7 +77,7 @@ async def user_login(request: UserLoginSchema, db: Session = Depends(get_db)):
         )
 
     # ✅ Add password verification
-    if not user_obj.verify_password(request.password):
+    if not await password_hasher.verify(request.password, user_obj.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
@@ -77,7 +87,7 @@ async def user_login(request: UserLoginSchema, db: Session = Depends(get_db)):
     access_token = generate_access_token(user_obj.id)
     refresh_token = generate_refresh_token(user_obj.id)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "detail": "logged in successfully",
             "access_token": access_token,
@@ -91,8 +101,8 @@ async def user_login(request: UserLoginSchema, db: Session = Depends(get_db)):
 @router.post("/logout")
 async def logout(
     request: Request,
-    current_user: UsersModel = Depends(get_authenticated_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Logout user by blacklisting the current token"""
     auth_header = request.headers.get("Authorization")
@@ -100,9 +110,9 @@ async def logout(
         token = auth_header.replace("Bearer ", "")
 
         # ✅ اینجا از تابع import شده استفاده میشه
-        add_token_to_blacklist(token, current_user.id, db)
+        await add_token_to_blacklist(token, current_user.id, db)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={"detail": "Successfully logged out"},
             status_code=status.HTTP_200_OK,
         )
@@ -112,35 +122,34 @@ async def logout(
         )
 
 
-# @router.post("/logout-all") # Testing and Dev
-# async def logout_all(
-#     current_user: UsersModel = Depends(get_authenticated_user),
-#     db: Session = Depends(get_db)
-# ):
-#     """Logout user from all devices by blacklisting all user's tokens"""
-#     # In a real scenario, you might want to track tokens per user
-#     # For now, we'll blacklist based on user ID in future implementations
+@router.post("/logout-all")
+async def logout_all(
+    current_user: Principal = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Logout user from all devices by moving the user's token epoch forward"""
+    await revoke_all_user_tokens(current_user.id, db)
 
-#     return JSONResponse(
-#         content={"detail": "Logged out from all devices"},
-#         status_code=status.HTTP_200_OK
-#     )
+    return ORJSONResponse(
+        content={"detail": "Logged out from all devices"},
+        status_code=status.HTTP_200_OK,
+    )
 
 
 @router.post("/refresh_token")
 async def user_refresh_token(
-    request: UserRefreshTokenSchema, db: Session = Depends(get_db)
+    request: UserRefreshTokenSchema, db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token - automatically blacklists the old refresh token"""
-    user_id = decode_refresh_token(request.token)
+    user_id = await decode_refresh_token(request.token, db)
 
     # Blacklist the used refresh token
-    add_token_to_blacklist(request.token, user_id, db)
+    await add_token_to_blacklist(request.token, user_id, db)
 
     # Generate new tokens
     new_access_token = generate_access_token(user_id)
     new_refresh_token = generate_refresh_token(user_id)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"access_token": new_access_token, "refresh_token": new_refresh_token}
     )
@@ -0,0 +1,89 @@
+"""
+Concurrent request benchmark against a running API instance.
+
+Logs in once, then keeps `--concurrency` requests in flight against an
+authenticated endpoint for `--duration` seconds and reports throughput and
+latency percentiles. Run it against a build before and after a change with
+the same database and worker count, e.g. to compare the sync Session and
+AsyncSession paths:
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/bench_concurrent_requests.py http://localhost:8000 \\
+        --username bench --password benchpass123 --path /resumes/my-resumes \\
+        --concurrency 50 --duration 20
+"""
+
+import argparse
+import asyncio
+import math
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def worker(client, path, headers, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(values, fraction):
+    return values[min(math.ceil(len(values) * fraction), len(values)) - 1]
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        response = await client.post(
+            "/users/login", json={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies, statuses = [], Counter()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                worker(client, args.path, headers, deadline, latencies, statuses)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{args.path} concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"requests={len(latencies)}  throughput={len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(
+            f"p50={statistics.median(latencies):.1f} ms  "
+            f"p95={percentile(latencies, 0.95):.1f} ms  "
+            f"p99={percentile(latencies, 0.99):.1f} ms  max={latencies[-1]:.1f} ms"
+        )
+    print("status counts:", dict(statuses))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base_url")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/resumes/my-resumes")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Repeat-view benchmark for resume downloads against a running API instance.
+
+Uploads one `--size-mb` PDF (or uses `--resume-id`), then views it
+`--views` times in each of three ways and reports bytes received and latency
+per mode:
+
+    full         plain GET, as before ETag support
+    revalidate   GET with If-None-Match from the first response (browser cache)
+    range        GET of the first 64 KB, as PDF viewers do on open
+
+    python benchmarks/bench_download_cache.py http://localhost:8000 \\
+        --username bench --password benchpass123 --views 200
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+RANGE_HEADER = "bytes=0-65535"
+
+
+def percentile(values, fraction):
+    return values[min(math.ceil(len(values) * fraction), len(values)) - 1]
+
+
+async def view(client, url, headers, views, concurrency):
+    latencies, statuses = [], Counter()
+    received = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal received
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+            received += len(response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(views)))
+    return time.perf_counter() - started, sorted(latencies), statuses, received
+
+
+async def run(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        response = await client.post(
+            "/users/login", json={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        resume_id = args.resume_id
+        if resume_id is None:
+            payload = b"%PDF-1.4\n" + os.urandom(int(args.size_mb * 1024 * 1024) - 9)
+            files = {"resume": ("bench.pdf", payload, "application/pdf")}
+            response = await client.post("/resumes/upload", files=files, headers=auth)
+            response.raise_for_status()
+            resume_id = response.json()["resume"]["id"]
+        url = f"/resumes/download/{resume_id}"
+
+        first = await client.get(url, headers=auth)
+        first.raise_for_status()
+        modes = {
+            "full": auth,
+            "revalidate": {**auth, "If-None-Match": first.headers.get("etag", '""')},
+            "range": {**auth, "Range": RANGE_HEADER},
+        }
+        print(f"{url} size={len(first.content)} bytes views={args.views}")
+        for mode, headers in modes.items():
+            elapsed, latencies, statuses, received = await view(
+                client, url, headers, args.views, args.concurrency
+            )
+            print(
+                f"{mode:<10} bytes={received:>12}  per view={received // args.views:>9}  "
+                f"p50={statistics.median(latencies):.2f} ms  "
+                f"p95={percentile(latencies, 0.95):.2f} ms  "
+                f"rate={args.views / elapsed:.0f}/s  status={dict(statuses)}"
+            )
+
+        if args.resume_id is None:
+            await client.delete(f"/resumes/{resume_id}", headers=auth)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base_url")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--resume-id", type=int)
+    parser.add_argument("--size-mb", type=float, default=2.0)
+    parser.add_argument("--views", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
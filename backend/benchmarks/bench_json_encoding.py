@@ -0,0 +1,78 @@
+"""
+JSON encoding micro-benchmark on ExpertResumeResponse payloads.
+
+Builds `--rows` realistic expert listing entries and times rendering them the
+way FastAPI does for a route's return value (jsonable_encoder, then the
+response class) with the stdlib JSONResponse and with ORJSONResponse, plus
+the render step alone on already-encoded content.
+
+Usage:
+    python benchmarks/bench_json_encoding.py --rows 1000 10000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from app.CV.schemas import ExpertResumeResponse  # noqa: E402
+
+
+def payload(rows: int) -> list:
+    now = datetime.now()
+    return [
+        ExpertResumeResponse(
+            id=n,
+            user_id=n // 5 + 1,
+            file_name=f"resume_{n}.pdf",
+            file_size=150_000 + n,
+            file_path=f"uploads/resumes/{n // 5 + 1}_20260101_120000_{n:06d}.pdf",
+            mime_type="application/pdf",
+            created_date=now - timedelta(seconds=n),
+            updated_date=now - timedelta(seconds=n),
+            username=f"user{n // 5 + 1}",
+            email=f"user{n // 5 + 1}@example.com",
+            github=f"https://github.com/user{n // 5 + 1}",
+        )
+        for n in range(rows)
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        models = payload(rows)
+        encoded = jsonable_encoder(models)
+        # same bytes on the wire, datetimes included
+        assert JSONResponse(encoded).body == ORJSONResponse(encoded).body
+
+        print(f"\n{rows} ExpertResumeResponse rows (best of {args.repeat})")
+        for name, cls in (("json", JSONResponse), ("orjson", ORJSONResponse)):
+            full = best_of(args.repeat, lambda: cls(jsonable_encoder(models)))
+            render = best_of(args.repeat, lambda: cls(encoded))
+            print(f"  {name:<7} encoder+render={full:8.1f} ms  render={render:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Listing serialization benchmark: CPU time and peak RSS of the expert listing.
+
+Seeds a scratch SQLite database with `--rows` resumes and serializes all of
+them to JSON three ways, each in a fresh process so peak RSS is per path:
+
+  orm        full ORM objects with joinedload, one ExpertResumeResponse per
+             row, then FastAPI's response_model validation and jsonable_encoder
+             (the previous implementation)
+  projected  column-projected rows validated and dumped by one TypeAdapter
+  trusted    column-projected rows dumped without validation
+             (LISTING_VALIDATE_ROWS=false)
+
+Usage:
+    python benchmarks/bench_listing_serialization.py --rows 10000 100000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DB_FILE = Path(tempfile.mkdtemp()) / "bench_listing.db"
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, engine, session_local  # noqa: E402
+from app.CV.models import Resume  # noqa: E402
+from app.CV.routes import expert_resume_rows, expert_resumes_query  # noqa: E402
+from app.CV.schemas import ExpertResumeResponse  # noqa: E402
+from app.users.models import UsersModel, UserRole  # noqa: E402
+
+PATHS = ("orm", "projected", "trusted")
+
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    users = max(rows // 5, 1)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(delete(Resume))
+        conn.execute(delete(UsersModel))
+        conn.execute(
+            insert(UsersModel),
+            [
+                {
+                    "id": n,
+                    "username": f"user{n}",
+                    "email": f"user{n}@example.com",
+                    "github": f"https://github.com/user{n}",
+                    "password": "x",
+                    "role": UserRole.CANDIDATE,
+                    "is_active": True,
+                }
+                for n in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(Resume),
+            [
+                {
+                    "user_id": n % users + 1,
+                    "file_path": f"uploads/resumes/{n}_20260101_120000_000000.pdf",
+                    "file_name": f"resume_{n}.pdf",
+                    "file_size": 150_000 + n,
+                    "mime_type": "application/pdf",
+                    "created_date": now - timedelta(seconds=n),
+                    "updated_date": now - timedelta(seconds=n),
+                }
+                for n in range(rows)
+            ],
+        )
+
+
+def orm_path() -> bytes:
+    adapter = TypeAdapter(list[ExpertResumeResponse])
+    with session_local() as db:
+        resumes = db.scalars(select(Resume).options(joinedload(Resume.user)))
+        models = [
+            ExpertResumeResponse(
+                id=r.id,
+                user_id=r.user_id,
+                file_name=r.file_name,
+                file_size=r.file_size,
+                file_path=r.file_path,
+                mime_type=r.mime_type,
+                created_date=r.created_date,
+                updated_date=r.updated_date,
+                username=r.user.username,
+                email=r.user.email,
+                github=r.user.github,
+            )
+            for r in resumes
+        ]
+        validated = adapter.validate_python(models)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def projected_path(validate: bool) -> bytes:
+    settings.LISTING_VALIDATE_ROWS = validate
+    with session_local() as db:
+        rows = db.execute(expert_resumes_query()).all()
+        return expert_resume_rows.dump_many(rows)
+
+
+def measure(path: str, queue) -> None:
+    started = time.process_time()
+    if path == "orm":
+        body = orm_path()
+    else:
+        body = projected_path(validate=path == "projected")
+    cpu = time.process_time() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((cpu, peak_kb, len(body)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    for rows in args.rows:
+        seed(rows)
+        print(f"\n{rows} resumes")
+        for path in PATHS:
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(path, queue))
+            process.start()
+            cpu, peak_kb, size = queue.get()
+            process.join()
+            print(
+                f"  {path:<10} cpu={cpu * 1000:8.0f} ms  "
+                f"peak_rss={peak_kb / 1024:7.1f} MiB  body={size / 1e6:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Login storm benchmark: latency of an unrelated endpoint while logins hash passwords.
+
+Runs the app in-process against a scratch SQLite database, fires a burst of
+concurrent /users/login calls and meanwhile probes GET / every few
+milliseconds. The run is repeated with bcrypt inline on the event loop
+(PASSWORD_HASH_WORKERS=0, the old behaviour) and on the worker pool.
+
+Usage:
+    python benchmarks/bench_login_storm.py --logins 40 --workers 4
+    python benchmarks/bench_login_storm.py --executor thread
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DB_FILE = Path(tempfile.mkdtemp()) / "bench_login.db"
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.database import Base, engine, session_local  # noqa: E402
+from app.users.models import UsersModel  # noqa: E402
+from app.auth.password_hashing import password_hasher  # noqa: E402
+
+
+def seed() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = session_local()
+    user = UsersModel(username="stormuser", email="storm@example.com", github="-")
+    user.set_password("stormpass123")
+    db.add(user)
+    db.commit()
+    db.close()
+
+
+async def run(logins: int, probe_interval: float) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        done = asyncio.Event()
+        latencies = []
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(probe_interval)
+
+        async def login():
+            await client.post(
+                "/users/login", json={"username": "stormuser", "password": "stormpass123"}
+            )
+
+        prober = asyncio.create_task(probe())
+        await asyncio.gather(*(login() for _ in range(logins)))
+        done.set()
+        await prober
+        return latencies
+
+
+def summary(name: str, latencies: list, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(math.ceil(len(latencies) * 0.99), len(latencies)) - 1]
+    print(
+        f"{name:<7} probes={len(latencies):5d}  p50={statistics.median(latencies):8.2f} ms  "
+        f"p99={p99:8.2f} ms  max={latencies[-1]:8.2f} ms  storm={elapsed:6.2f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=("thread", "process"), default="process")
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    seed()
+    password_hasher.max_pending = args.logins
+    password_hasher.executor_type = args.executor
+    for name, workers in (("inline", 0), ("pool", args.workers)):
+        password_hasher.workers = workers
+        start = time.perf_counter()
+        latencies = asyncio.run(run(args.logins, args.probe_interval))
+        summary(name, latencies, time.perf_counter() - start)
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Concurrent resume upload benchmark against a running API instance.
+
+Logs in once, then keeps `--concurrency` uploads of a `--size-mb` PDF in
+flight for `--duration` seconds and reports uploads/s, MB/s and latency
+percentiles. Each uploaded resume is deleted again unless --keep is given, so
+the storage directory does not grow during long runs. Run it before and after
+a change with the same worker count and disk, e.g.:
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/bench_upload_throughput.py http://localhost:8000 \\
+        --username bench --password benchpass123 --concurrency 8 --duration 20
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def worker(client, payload, headers, keep, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        files = {"resume": ("bench.pdf", payload, "application/pdf")}
+        start = time.perf_counter()
+        try:
+            response = await client.post("/resumes/upload", files=files, headers=headers)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code == 200 and not keep:
+            resume_id = response.json()["resume"]["id"]
+            await client.delete(f"/resumes/{resume_id}", headers=headers)
+
+
+def percentile(values, fraction):
+    return values[min(math.ceil(len(values) * fraction), len(values)) - 1]
+
+
+async def run(args) -> None:
+    payload = b"%PDF-1.4\n" + os.urandom(int(args.size_mb * 1024 * 1024) - 9)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        response = await client.post(
+            "/users/login", json={"username": args.username, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies, statuses = [], Counter()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                worker(client, payload, headers, args.keep, deadline, latencies, statuses)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    uploaded_mb = statuses[200] * len(payload) / (1024 * 1024)
+    print(
+        f"upload size={args.size_mb}MB concurrency={args.concurrency} "
+        f"duration={elapsed:.1f}s"
+    )
+    print(
+        f"uploads={statuses[200]}  throughput={statuses[200] / elapsed:.2f} uploads/s  "
+        f"{uploaded_mb / elapsed:.1f} MB/s"
+    )
+    if latencies:
+        print(
+            f"p50={statistics.median(latencies):.1f} ms  "
+            f"p95={percentile(latencies, 0.95):.1f} ms  "
+            f"p99={percentile(latencies, 0.99):.1f} ms  max={latencies[-1]:.1f} ms"
+        )
+    print("status counts:", dict(statuses))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base_url")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--size-mb", type=float, default=9.9)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--keep", action="store_true", help="Do not delete uploads")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()